@@ -18,8 +18,9 @@ setup(
     package_dir={"": "src"},
     packages=find_packages(where="src"),
     install_requires=[
-        "openai>=1.0.0",
-        "anthropic>=0.25.0",
+        "openai>=1.17.0",
+        "anthropic>=0.28.0",
+        "httpx>=0.23.0",
         "gitpython>=3.1.40",
         "PyYAML>=6.0",
         "python-dotenv>=1.0.0",
@@ -29,9 +30,16 @@ setup(
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
+            "pytest-xdist>=3.0.0",
             "black>=23.0.0",
             "flake8>=6.1.0",
         ],
+        "completion": [
+            "argcomplete>=2.0.0",
+        ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -5,9 +5,26 @@ An autonomous agent that can read, write, refactor code, run tests,
 and manage repository changes using LLM assistance.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 
-from .agent import RepoAgent
-from .config import Config
+if TYPE_CHECKING:
+    from .agent import RepoAgent
+    from .config import Config
 
 __all__ = ["RepoAgent", "Config"]
+
+# Public names are imported on first access so that importing the package
+# (e.g. for the CLI) doesn't pull in GitPython and the LLM clients up front
+_LAZY_IMPORTS = {"RepoAgent": ".agent", "Config": ".config"}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
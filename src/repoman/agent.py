@@ -1,16 +1,20 @@
 """Main autonomous agent for Repoman."""
 
+import asyncio
+import atexit
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Union
 from pathlib import Path
 
+from git.exc import GitError
+
+from .cache import LLMCache
 from .config import Config
-from .llm import LLMClient
-from .file_ops import FileOperations
+from .llm import LLMClient, RateLimiter, create_http_client
+from .file_ops import FileList, FileOperations
 from .git_ops import GitOperations
 from .runner import Runner
 
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -38,21 +42,24 @@ class RepoAgent:
 
         # Initialize components
         self._llm = None  # Lazy initialization
+        self._close_at_exit = False  # Set once close is registered with atexit
+        self._git_ops: Optional[GitOperations] = None  # Lazy initialization
+        self._runner: Optional[Runner] = None  # Lazy initialization
         self.file_ops = FileOperations(
-            str(self.repo_path),
+            self.repo_path,
             protected_patterns=self.config.get("safety.protected_files"),
         )
-        self.git_ops = GitOperations(
-            str(self.repo_path),
-            auto_commit=self.config.get("repository.auto_commit"),
-        )
-        self.runner = Runner(
-            str(self.repo_path),
-            timeout=self.config.get("tasks.timeout"),
-        )
 
         self.dry_run = self.config.get("safety.dry_run", False)
         self.max_iterations = self.config.get("tasks.max_iterations", 5)
+        self.max_concurrency = self.config.get("tasks.max_concurrency", 16)
+
+        # Repository file listing, loaded once and reset when files change
+        self._file_index: Optional[FileList] = None
+
+        self.cache: Optional[LLMCache] = None
+        if self.config.get("cache.enabled", True):
+            self.cache = self._open_cache()
 
         logger.info(f"Initialized RepoAgent for repository: {self.repo_path}")
 
@@ -63,6 +70,30 @@ class RepoAgent:
             self._llm = self._init_llm()
         return self._llm
 
+    @property
+    def git_ops(self) -> GitOperations:
+        """Lazy initialization of git operations."""
+        if self._git_ops is None:
+            self._git_ops = GitOperations(
+                self.repo_path,
+                auto_commit=self.config.get("repository.auto_commit"),
+                status_ttl=self.config.get("repository.status_cache_ttl", 2.0),
+                fast_config=self.config.get("repository.git_fast_config", True),
+                include_untracked=self.config.get("repository.include_untracked", True),
+            )
+        return self._git_ops
+
+    @property
+    def runner(self) -> Runner:
+        """Lazy initialization of command runner."""
+        if self._runner is None:
+            self._runner = Runner(
+                self.repo_path,
+                timeout=self.config.get("tasks.timeout"),
+                max_lines=self.config.get("tasks.output_max_lines", 10000),
+            )
+        return self._runner
+
     def _init_llm(self) -> LLMClient:
         """Initialize LLM client from config."""
         provider = self.config.get("llm.provider", "openai")
@@ -70,12 +101,42 @@ class RepoAgent:
         temperature = self.config.get("llm.temperature", 0.7)
         max_tokens = self.config.get("llm.max_tokens", 2000)
 
-        return LLMClient(
+        # One pooled HTTP client for the agent lifetime keeps connections warm
+        http_client = create_http_client(
             provider=provider,
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
+            max_connections=self.config.get("llm.max_connections", 32),
+            keepalive_expiry=self.config.get("llm.keepalive_expiry", 60),
         )
+        try:
+            llm = LLMClient(
+                provider=provider,
+                model=model,
+                http_client=http_client,
+                rate_limiter=RateLimiter(
+                    rpm=self.config.get("llm.rpm", 500),
+                    tpm=self.config.get("llm.tpm", 0),
+                ),
+                max_retries=self.config.get("llm.max_retries", 3),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        except Exception:
+            http_client.close()
+            raise
+
+        # close() drops the client, so the next use re-initializes it
+        if not self._close_at_exit:
+            atexit.register(self.close)
+            self._close_at_exit = True
+        return llm
+
+    def close(self) -> None:
+        """Release pooled connections and git processes held by the agent."""
+        if self._llm is not None:
+            self._llm.close()
+            self._llm = None
+        if self._git_ops is not None:
+            self._git_ops.close()
 
     def analyze_codebase(self, patterns: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -85,36 +146,52 @@ class RepoAgent:
             patterns: File patterns to analyze (defaults to common code files)
 
         Returns:
-            Analysis results
+            Analysis results; git_status is None outside a git repository
         """
         if patterns is None:
             patterns = ["*.py", "*.js", "*.go", "*.java", "*.ts"]
 
-        files = []
-        for pattern in patterns:
-            files.extend(self.file_ops.find_files(pattern))
+        files = self.file_ops.filter_paths(self._get_file_index(), patterns)
+
+        try:
+            git_status: Optional[Dict[str, Any]] = self.git_ops.get_status()
+        except ValueError:
+            git_status = None  # Not a git repository
 
         analysis = {
             "total_files": len(files),
             "files": files[:100],  # Limit for display
-            "git_status": self.git_ops.get_status(),
+            "git_status": git_status,
         }
 
         logger.info(f"Analyzed {len(files)} files matching patterns: {patterns}")
         return analysis
 
-    def read_file(self, file_path: str) -> str:
+    def _get_file_index(self) -> FileList:
+        """Return all repository files, listing them on first use."""
+        if self._file_index is None:
+            try:
+                files = self.git_ops.ls_files()
+            except (GitError, ValueError) as e:
+                # ValueError: the path is not a git repository
+                logger.debug(f"git ls-files failed, walking the tree instead: {e}")
+                files = self.file_ops.find_files_multi(["*"])
+            self._file_index = FileList(files)
+        return self._file_index
+
+    def read_file(self, file_path: str, max_bytes: Optional[int] = None) -> str:
         """
         Read a file from the repository.
 
         Args:
             file_path: Path to file
+            max_bytes: Only read this many bytes from the start of the file
 
         Returns:
             File content
         """
         logger.info(f"Reading file: {file_path}")
-        return self.file_ops.read_file(file_path)
+        return self.file_ops.read_file(file_path, max_bytes=max_bytes)
 
     def write_file(self, file_path: str, content: str, commit: bool = True) -> None:
         """
@@ -135,6 +212,9 @@ class RepoAgent:
             return
 
         self.file_ops.write_file(file_path, content)
+        if self._git_ops is not None:
+            self._git_ops.invalidate_status()
+        self._file_index = None
 
         if commit and self.config.get("repository.auto_commit"):
             self._auto_commit([file_path])
@@ -156,8 +236,9 @@ class RepoAgent:
         logger.info(f"Refactoring file: {file_path}")
 
         original_content = self.read_file(file_path)
-        refactored_content = self.llm.generate_code_refactor(
-            original_content, instructions
+        refactored_content = self._cached(
+            self._cache_key("refactor", original_content, instructions),
+            lambda: self.llm.generate_code_refactor(original_content, instructions),
         )
 
         # Clean up markdown code blocks if present
@@ -184,10 +265,198 @@ class RepoAgent:
         logger.info(f"Analyzing file: {file_path}")
 
         content = self.read_file(file_path)
-        analysis = self.llm.generate_code_analysis(content, task)
+        analysis = self._cached(
+            self._cache_key("analysis", content, task),
+            lambda: self.llm.generate_code_analysis(content, task),
+        )
 
         return analysis
 
+    async def analyze_files(
+        self,
+        file_paths: List[str],
+        task: str,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Analyze several files concurrently.
+
+        Args:
+            file_paths: Paths to files
+            task: Analysis task description
+            max_concurrency: Maximum in-flight LLM requests
+                (defaults to tasks.max_concurrency)
+
+        Returns:
+            Mapping of file path to analysis
+        """
+        llm = self.llm
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def analyze(file_path: str) -> str:
+            async with semaphore:
+                logger.info(f"Analyzing file: {file_path}")
+                content = self.read_file(file_path)
+                return await self._acached(
+                    self._cache_key("analysis", content, task),
+                    lambda: llm.agenerate_code_analysis(content, task),
+                )
+
+        results = await asyncio.gather(*(analyze(path) for path in file_paths))
+        return dict(zip(file_paths, results))
+
+    async def analyze_files_marshaled(
+        self,
+        file_paths: List[str],
+        task: str,
+        batch: int = 8,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Analyze files by packing several of them into each LLM request.
+
+        Files are grouped into batches of up to ``batch`` files that fit the
+        model's input budget. A batch whose response cannot be parsed falls
+        back to one request per file.
+
+        Args:
+            file_paths: Paths to files
+            task: Analysis task description
+            batch: Maximum number of files per request
+            max_concurrency: Maximum in-flight LLM requests
+                (defaults to tasks.max_concurrency)
+
+        Returns:
+            Mapping of file path to analysis
+        """
+        llm = self.llm
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        contents = {path: self.read_file(path) for path in file_paths}
+
+        analysis: Dict[str, str] = {}
+        if self.cache is not None:
+            for path, content in list(contents.items()):
+                key = self._cache_key("batch-analysis", content, task)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    analysis[path] = cached
+                    del contents[path]
+
+        async def analyze(group: List[str]) -> Dict[str, str]:
+            async with semaphore:
+                if len(group) > 1:
+                    logger.info(f"Analyzing {len(group)} files in one request")
+                    try:
+                        return await llm.agenerate_batch_analysis(
+                            {path: contents[path] for path in group}, task
+                        )
+                    except ValueError as e:
+                        logger.warning(f"Batch analysis failed, retrying per file: {e}")
+
+                results = {}
+                for path in group:
+                    logger.info(f"Analyzing file: {path}")
+                    results[path] = await llm.agenerate_code_analysis(
+                        contents[path], task
+                    )
+                return results
+
+        groups = self._plan_batches(contents, batch)
+        for result in await asyncio.gather(*(analyze(group) for group in groups)):
+            analysis.update(result)
+            if self.cache is not None:
+                for path, text in result.items():
+                    key = self._cache_key("batch-analysis", contents[path], task)
+                    self.cache.set(key, text)
+
+        return {path: analysis[path] for path in file_paths}
+
+    def _plan_batches(self, contents: Dict[str, str], batch: int) -> List[List[str]]:
+        """
+        Group files into batches that fit the LLM input budget.
+
+        Args:
+            contents: Mapping of file path to content
+            batch: Maximum number of files per batch
+
+        Returns:
+            List of file path groups
+        """
+        context_window = self.config.get("llm.context_window", 8192)
+        budget = context_window - self.config.get("llm.max_tokens", 2000)
+
+        groups: List[List[str]] = []
+        current: List[str] = []
+        used = 0
+        for path, content in contents.items():
+            tokens = self.llm.count_tokens(content)
+            if current and (len(current) >= batch or used + tokens > budget):
+                groups.append(current)
+                current, used = [], 0
+            current.append(path)
+            used += tokens
+
+        if current:
+            groups.append(current)
+        return groups
+
+    async def refactor_files(
+        self,
+        file_paths: List[str],
+        instructions: str,
+        commit: bool = True,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Refactor several files concurrently using LLM.
+
+        LLM requests run concurrently; files are written afterwards in
+        order and auto-committed together.
+
+        Args:
+            file_paths: Paths to files
+            instructions: Refactoring instructions
+            commit: Auto-commit the changes
+            max_concurrency: Maximum in-flight LLM requests
+                (defaults to tasks.max_concurrency)
+
+        Returns:
+            Mapping of file path to refactored content
+        """
+        llm = self.llm
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def refactor(file_path: str) -> str:
+            async with semaphore:
+                logger.info(f"Refactoring file: {file_path}")
+                content = self.read_file(file_path)
+                refactored = await self._acached(
+                    self._cache_key("refactor", content, instructions),
+                    lambda: llm.agenerate_code_refactor(content, instructions),
+                )
+                return self._clean_code_output(refactored)
+
+        results = dict(
+            zip(
+                file_paths,
+                await asyncio.gather(*(refactor(path) for path in file_paths)),
+            )
+        )
+
+        if self.dry_run:
+            logger.info("[DRY RUN] Would refactor files")
+            return results
+
+        self.file_ops.write_files(results.items())
+        if self._git_ops is not None:
+            self._git_ops.invalidate_status()
+        self._file_index = None
+
+        if commit and self.config.get("repository.auto_commit"):
+            self._auto_commit(file_paths)
+
+        return results
+
     def run_tests(self, test_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Run tests.
@@ -208,7 +477,7 @@ class RepoAgent:
 
         return result
 
-    def run_command(self, command: str) -> Dict[str, Any]:
+    def run_command(self, command: Union[str, List[str]]) -> Dict[str, Any]:
         """
         Run a shell command.
 
@@ -219,6 +488,7 @@ class RepoAgent:
             Command results
         """
         logger.info(f"Running command: {command}")
+        self._file_index = None
         return self.runner.run_command(command)
 
     def commit_changes(
@@ -242,7 +512,12 @@ class RepoAgent:
 
         # Generate message from diff if not provided
         if message is None:
-            diff = self.git_ops.get_diff()
+            if files:
+                self.git_ops.add_files(files)
+            # Summarize what will be committed: the staged changes if there
+            # are any, otherwise the working tree that commit will stage
+            staged = self.git_ops.is_staged()
+            diff = self.git_ops.get_diff_summary(staged=staged)
             if diff:
                 message = self.llm.generate_commit_message(diff)
                 # Clean up the message
@@ -257,6 +532,7 @@ class RepoAgent:
 
         logger.info(f"Committing with message: {message}")
         commit_sha = self.git_ops.commit(message, files)
+        self._file_index = None
         logger.info(f"Created commit: {commit_sha[:8]}")
 
         return commit_sha
@@ -280,6 +556,7 @@ class RepoAgent:
             return
 
         self.git_ops.create_branch(branch_name, checkout)
+        self._file_index = None
 
     def execute_task(self, task_description: str) -> Dict[str, Any]:
         """
@@ -319,15 +596,47 @@ Provide a numbered list of specific steps to accomplish this task."""
             "status": "planned",
         }
 
+    def clear_cache(self) -> None:
+        """Remove all cached LLM responses, even while caching is disabled."""
+        (self.cache or self._open_cache()).clear()
+
+    def _open_cache(self) -> LLMCache:
+        """Return a cache on the configured directory, relative to the repo."""
+        cache_dir = self.config.get("cache.directory", ".repoman/cache")
+        return LLMCache(str(self.repo_path / cache_dir))
+
+    def _cache_key(self, kind: str, content: str, instructions: str) -> str:
+        """Build the cache key for an LLM request about file content."""
+        return LLMCache.make_key(
+            kind,
+            self.config.get("llm.provider", "openai"),
+            self.config.get("llm.model"),
+            self.config.get("llm.temperature", 0.7),
+            content,
+            instructions,
+        )
+
+    def _cached(self, key: str, compute: Callable[[], str]) -> str:
+        """Return a cached LLM response, computing it on a miss."""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(key, compute)
+
+    async def _acached(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Async variant of _cached."""
+        if self.cache is None:
+            return await compute()
+        return await self.cache.aget_or_compute(key, compute)
+
     def _auto_commit(self, files: List[str]) -> None:
         """Auto-commit changes to specified files."""
         if not self.config.get("repository.auto_commit"):
             return
 
         try:
-            diff = self.git_ops.get_diff()
-            if diff:
-                self.git_ops.add_files(files)
+            # Staging first lets a cheap diff --quiet tell whether anything changed
+            self.git_ops.add_files(files)
+            if self.git_ops.is_staged():
                 self.commit_changes(files=files)
         except Exception as e:
             logger.warning(f"Auto-commit failed: {e}")
@@ -342,15 +651,16 @@ Provide a numbered list of specific steps to accomplish this task."""
         Returns:
             Clean code
         """
-        lines = code.strip().split("\n")
+        code = code.strip()
 
-        # Remove markdown code fences
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
+        # Remove markdown code fences by slicing instead of splitting lines;
+        # the closing fence may share a line with the last line of code
+        if code.startswith("```"):
+            code = code.partition("\n")[2]
+        if code.endswith("```"):
+            code = code[:-3].rstrip("\n")
 
-        return "\n".join(lines)
+        return code
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,118 @@
+"""Response caching for Repoman."""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+
+class LLMCache:
+    """Content-addressed on-disk cache for LLM responses."""
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cached responses
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a cache key from the inputs that determine a response.
+
+        Args:
+            *parts: Values such as provider, model, temperature and prompt data
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response or None on a miss
+        """
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key
+            value: Response to store
+        """
+        path = self._path(key)
+        if not path.parent.exists():
+            self._ensure_dir(path.parent)
+
+        # Write atomically so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Return the cached response, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Function producing the response
+
+        Returns:
+            Response
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    async def aget_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Async variant of get_or_compute."""
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+
+    def _path(self, key: str) -> Path:
+        """Return the file path for a key, sharded by prefix."""
+        return self.cache_dir / key[:2] / key
+
+    def _ensure_dir(self, directory: Path) -> None:
+        """Create a cache directory, keeping the cache out of git."""
+        directory.mkdir(parents=True, exist_ok=True)
+        gitignore = self.cache_dir / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("*\n")
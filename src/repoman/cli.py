@@ -1,11 +1,31 @@
+# PYTHON_ARGCOMPLETE_OK
 """Command-line interface for Repoman."""
 
 import argparse
+import os
 import sys
 import json
+from typing import Any
 
-from .agent import RepoAgent
-from .config import Config
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize command output as indented JSON.
+
+    Uses orjson when it is installed and falls back to the standard library.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        JSON text
+    """
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(obj, indent=2)
+    options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    return orjson.dumps(obj, option=options).decode()
 
 
 def main():
@@ -29,6 +49,11 @@ def main():
         action="store_true",
         help="Run without making changes",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't reuse cached LLM responses",
+    )
 
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
@@ -70,6 +95,23 @@ def main():
     analyze_file_parser.add_argument("file", help="File path")
     analyze_file_parser.add_argument("task", help="Analysis task")
 
+    # Analyze multiple files command
+    analyze_files_parser = subparsers.add_parser(
+        "analyze-files", help="Analyze several files concurrently"
+    )
+    analyze_files_parser.add_argument("task", help="Analysis task")
+    analyze_files_parser.add_argument("files", nargs="+", help="File paths")
+    analyze_files_parser.add_argument(
+        "--parallel",
+        type=int,
+        help="Maximum concurrent LLM requests (default: tasks.max_concurrency)",
+    )
+    analyze_files_parser.add_argument(
+        "--batch",
+        type=int,
+        help="Pack up to this many files into each LLM request",
+    )
+
     # Test command
     test_parser = subparsers.add_parser("test", help="Run tests")
     test_parser.add_argument("--path", help="Specific test file or directory")
@@ -94,12 +136,24 @@ def main():
     task_parser = subparsers.add_parser("task", help="Execute a high-level task")
     task_parser.add_argument("description", help="Task description")
 
+    # Cache clear command
+    subparsers.add_parser("cache-clear", help="Clear cached LLM responses")
+
     # Init config command
     init_parser = subparsers.add_parser("init", help="Initialize configuration")
     init_parser.add_argument(
         "--output", default="config/repoman.yaml", help="Output path"
     )
 
+    # Shell completion is only loaded when argcomplete invokes the CLI
+    if "_ARGCOMPLETE" in os.environ:
+        try:
+            import argcomplete
+
+            argcomplete.autocomplete(parser)
+        except ImportError:
+            pass
+
     args = parser.parse_args()
 
     if not args.command:
@@ -108,16 +162,23 @@ def main():
 
     # Handle init separately as it doesn't need agent
     if args.command == "init":
+        from .config import Config
+
         config = Config()
         config.save(args.output)
         print(f"Configuration initialized at: {args.output}")
         return
 
+    # Imported here so --help and init don't pay for GitPython and LLM clients
+    from .agent import RepoAgent
+
     # Initialize agent
     try:
         agent = RepoAgent(repo_path=args.repo, config_path=args.config)
         if args.dry_run:
             agent.dry_run = True
+        if args.no_cache:
+            agent.cache = None
     except Exception as e:
         print(f"Error initializing agent: {e}", file=sys.stderr)
         sys.exit(1)
@@ -126,11 +187,11 @@ def main():
     try:
         if args.command == "status":
             status = agent.get_status()
-            print(json.dumps(status, indent=2))
+            print(_dumps(status))
 
         elif args.command == "analyze":
             analysis = agent.analyze_codebase(patterns=args.patterns)
-            print(json.dumps(analysis, indent=2))
+            print(_dumps(analysis))
 
         elif args.command == "read":
             content = agent.read_file(args.file)
@@ -152,6 +213,26 @@ def main():
             analysis = agent.analyze_file(args.file, args.task)
             print(analysis)
 
+        elif args.command == "analyze-files":
+            import asyncio
+
+            if args.batch:
+                analysis = agent.analyze_files_marshaled(
+                    args.files,
+                    args.task,
+                    batch=args.batch,
+                    max_concurrency=args.parallel,
+                )
+            else:
+                analysis = agent.analyze_files(
+                    args.files, args.task, max_concurrency=args.parallel
+                )
+            results = asyncio.run(analysis)
+            for file_path, analysis in results.items():
+                print(f"=== {file_path} ===")
+                print(analysis)
+                print()
+
         elif args.command == "test":
             result = agent.run_tests(test_path=args.path)
             print(f"Tests {'passed' if result['success'] else 'failed'}")
@@ -187,7 +268,11 @@ def main():
 
         elif args.command == "task":
             result = agent.execute_task(args.description)
-            print(json.dumps(result, indent=2))
+            print(_dumps(result))
+
+        elif args.command == "cache-clear":
+            agent.clear_cache()
+            print("Cache cleared")
 
     except Exception as e:
         print(f"Error executing command: {e}", file=sys.stderr)
@@ -4,6 +4,15 @@ import yaml
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+# Prefer the libyaml-backed C loader and dumper when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper  # type: ignore
+
+# Marks keys that have not been resolved yet in the lookup cache
+_MISS = object()
+
 
 class Config:
     """Manages configuration for the autonomous repo agent."""
@@ -17,17 +26,34 @@ class Config:
         """
         self.config_path = config_path or "config/repoman.yaml"
         self.config: Dict[str, Any] = {}
+        self._loaded_mtime: Optional[int] = None
+        self._get_cache: Dict[str, Any] = {}
         self.load_config()
 
     def load_config(self) -> None:
-        """Load configuration from YAML file."""
+        """
+        Load configuration from YAML file.
+
+        Reloading is a no-op if the file has not changed since it was last
+        loaded and no values have been set in the meantime.
+        """
         config_file = Path(self.config_path)
 
-        if config_file.exists():
-            with open(config_file, "r") as f:
-                self.config = yaml.safe_load(f) or {}
-        else:
+        try:
+            mtime = config_file.stat().st_mtime_ns
+        except FileNotFoundError:
             self.config = self._default_config()
+            self._loaded_mtime = None
+            self._get_cache.clear()
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        with open(config_file, "r") as f:
+            self.config = yaml.load(f, Loader=_Loader) or {}
+        self._loaded_mtime = mtime
+        self._get_cache.clear()
 
     def _default_config(self) -> Dict[str, Any]:
         """Return default configuration."""
@@ -37,16 +63,31 @@ class Config:
                 "model": "gpt-4",
                 "temperature": 0.7,
                 "max_tokens": 2000,
+                "context_window": 8192,
+                "max_connections": 32,
+                "keepalive_expiry": 60,
+                "max_retries": 3,
+                "rpm": 500,
+                "tpm": 0,
             },
             "repository": {
                 "auto_commit": True,
                 "commit_message_prefix": "[Repoman]",
                 "branch_prefix": "repoman/",
                 "auto_pr": False,
+                "status_cache_ttl": 2.0,
+                "git_fast_config": True,
+                "include_untracked": True,
             },
             "tasks": {
                 "max_iterations": 5,
                 "timeout": 300,
+                "max_concurrency": 16,
+                "output_max_lines": 10000,
+            },
+            "cache": {
+                "enabled": True,
+                "directory": ".repoman/cache",
             },
             "safety": {
                 "dry_run": False,
@@ -66,17 +107,23 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split(".")
-        value = self.config
+        value = self._get_cache.get(key, _MISS)
+        if value is _MISS:
+            value = self._lookup(key)
+            self._get_cache[key] = value
 
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                return default
+        return default if value is None else value
 
+    def _lookup(self, key: str) -> Any:
+        """Resolve a dot notation key, returning None if it is not set."""
+        value = self.config
+
+        for k in key.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(k)
             if value is None:
-                return default
+                return None
 
         return value
 
@@ -98,6 +145,10 @@ class Config:
 
         config[keys[-1]] = value
 
+        # In-memory values now differ from the file, so force the next reload
+        self._loaded_mtime = None
+        self._get_cache.clear()
+
     def save(self, path: Optional[str] = None) -> None:
         """
         Save configuration to YAML file.
@@ -109,4 +160,10 @@ class Config:
         save_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(save_path, "w") as f:
-            yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(
+                self.config,
+                f,
+                Dumper=_Dumper,
+                default_flow_style=False,
+                sort_keys=False,
+            )
@@ -1,14 +1,173 @@
 """File operations for Repoman."""
 
+import codecs
 import fnmatch
+import functools
+import mmap
+import os
+import re
+import stat
+from array import array
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Dict,
+    Any,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+# Directories skipped when searching the tree: VCS metadata, dependency
+# folders and caches never contain files the agent should work on
+IGNORED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".repoman",
+        "node_modules",
+        "__pycache__",
+        ".venv",
+        "venv",
+        ".tox",
+        ".nox",
+        ".mypy_cache",
+        ".pytest_cache",
+    }
+)
+
+# Files at least this large are decoded straight from a memory map instead
+# of being read into an intermediate bytes buffer first
+MMAP_THRESHOLD = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_patterns(patterns: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """
+    Combine glob patterns into a single regular expression.
+
+    Results are cached at module level, so instances created with the
+    same protected patterns share one compiled regex.
+
+    Args:
+        patterns: Glob patterns
+
+    Returns:
+        Compiled regex matching any pattern, or None if there are no patterns
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def _translate_newlines(content: str) -> str:
+    """Apply the universal newline translation of text mode to decoded text."""
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _split_magic(pattern: str) -> Tuple[str, str]:
+    """
+    Split a slash-separated glob pattern at its first wildcard component.
+
+    Args:
+        pattern: Glob pattern such as 'src/utils/*.py'
+
+    Returns:
+        Tuple of the wildcard-free leading path and the remaining pattern,
+        e.g. ('src/utils', '*.py')
+    """
+    parts = pattern.split("/")
+    for i, part in enumerate(parts):
+        if re.search(r"[*?[]", part):
+            return "/".join(parts[:i]), "/".join(parts[i:])
+    return "/".join(parts[:-1]), parts[-1]
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush a directory entry update to disk where the platform allows it."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on Windows
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class FileList(Sequence[str]):
+    """
+    Read-only list of paths stored compactly.
+
+    All paths are kept UTF-8 encoded in one bytes buffer with an array of
+    end offsets, instead of one str object per path. Paths are decoded
+    only when accessed, which keeps listings of large repositories small.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        """
+        Initialize the list.
+
+        Args:
+            paths: Paths to store, in order
+        """
+        parts = []
+        self._offsets = array("I", [0])
+        end = 0
+        for path in paths:
+            data = path.encode("utf-8", "surrogateescape")
+            parts.append(data)
+            end += len(data)
+            self._offsets.append(end)
+        self._buf = b"".join(parts)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileList index out of range")
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def _decode(self, index: int) -> str:
+        """Decode the path at a valid index."""
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._buf[start:end].decode("utf-8", "surrogateescape")
 
 
 class FileOperations:
     """Handles file system operations for the autonomous agent."""
 
-    def __init__(self, repo_path: str, protected_patterns: Optional[List[str]] = None):
+    def __init__(
+        self,
+        repo_path: Union[str, Path],
+        protected_patterns: Optional[List[str]] = None,
+    ):
         """
         Initialize file operations.
 
@@ -17,11 +176,40 @@ class FileOperations:
             protected_patterns: List of glob patterns for protected files
         """
         self.repo_path = Path(repo_path).resolve()
+        self._repo_path_str = str(self.repo_path)
+        # Repo-relative paths are sliced off this prefix rather than built
+        # with Path.relative_to, which is slow in per-file loops
+        self._repo_prefix = self._repo_path_str.rstrip(os.sep) + os.sep
         self.protected_patterns = protected_patterns or [
             ".git/**",
             ".github/**",
             "config/**",
         ]
+        self._protected_re = self._glob_re(self.protected_patterns)
+
+        # A path can only match a pattern if it starts with the pattern's
+        # literal prefix; usable as a pre-filter when no prefix is empty
+        prefixes = tuple(
+            re.split(r"[*?[]", pattern, 1)[0] for pattern in self.protected_patterns
+        )
+        self._protected_prefixes = prefixes if all(prefixes) else None
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop the compiled glob patterns shared by all instances."""
+        _compile_patterns.cache_clear()
+
+    def _glob_re(self, patterns: List[str]) -> Optional[Pattern[str]]:
+        """
+        Return the combined regex for glob patterns, compiling it once.
+
+        Args:
+            patterns: Glob patterns
+
+        Returns:
+            Compiled regex matching any pattern, or None if there are no patterns
+        """
+        return _compile_patterns(tuple(patterns))
 
     def is_protected(self, file_path: str) -> bool:
         """
@@ -33,64 +221,178 @@ class FileOperations:
         Returns:
             True if file is protected
         """
-        path = Path(file_path)
-        if path.is_absolute():
-            try:
-                relative_path = path.relative_to(self.repo_path)
-            except ValueError:
-                return True  # Outside repo is protected
+        if file_path.startswith(self._repo_prefix):
+            relative_str = file_path.partition(self._repo_prefix)[2]
         else:
-            relative_path = path
+            path = Path(file_path)
+            if path.is_absolute():
+                try:
+                    relative_path = path.relative_to(self.repo_path)
+                except ValueError:
+                    return True  # Outside repo is protected
+            else:
+                relative_path = path
+
+            relative_str = str(relative_path)
+
+        # All patterns are compiled into one regex when the instance is created
+        if self._protected_re is None:
+            return False
+        prefixes = self._protected_prefixes
+        if prefixes is not None and not f"{relative_str}/".startswith(prefixes):
+            return False
+        return bool(
+            self._protected_re.match(relative_str)
+            or self._protected_re.match(f"{relative_str}/**")
+        )
 
-        relative_str = str(relative_path)
+    def read_file(self, file_path: str, max_bytes: Optional[int] = None) -> str:
+        """
+        Read file content.
 
-        for pattern in self.protected_patterns:
-            if fnmatch.fnmatch(relative_str, pattern) or fnmatch.fnmatch(
-                f"{relative_str}/**", pattern
-            ):
-                return True
+        Args:
+            file_path: Path to file (relative to repo or absolute)
+            max_bytes: Read at most this many bytes from the start of the
+                file; a character cut off at the limit is dropped
 
-        return False
+        Returns:
+            File content
 
-    def read_file(self, file_path: str) -> str:
+        Raises:
+            FileNotFoundError: If file doesn't exist
         """
-        Read file content.
+        path = self._resolve_path(file_path)
+
+        if max_bytes is not None:
+            with open(path, "rb") as f:
+                data = f.read(max_bytes)
+            # Without final=True an incomplete trailing sequence is held back
+            content = codecs.getincrementaldecoder("utf-8")().decode(data)
+            return _translate_newlines(content)
+
+        if os.path.getsize(path) < MMAP_THRESHOLD:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+
+        with self.map_file(str(path)) as mapped:
+            return _translate_newlines(str(mapped, "utf-8"))
+
+    def map_file(self, file_path: str) -> mmap.mmap:
+        """
+        Memory-map a file read-only.
 
         Args:
             file_path: Path to file (relative to repo or absolute)
 
         Returns:
-            File content
+            Read-only memory map, usable as a context manager
 
         Raises:
             FileNotFoundError: If file doesn't exist
+            ValueError: If the file is empty
         """
         path = self._resolve_path(file_path)
 
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-    def write_file(self, file_path: str, content: str, force: bool = False) -> None:
+    def write_file(
+        self, file_path: str, content: str, force: bool = False, durable: bool = False
+    ) -> None:
         """
         Write content to file.
 
+        The content is written to a temporary file next to the target and
+        renamed over it, so readers never see a partially written file.
+
         Args:
             file_path: Path to file (relative to repo or absolute)
             content: Content to write
             force: Override protection check
+            durable: fsync the file and its directory before returning
 
         Raises:
             PermissionError: If file is protected and force is False
         """
+        target = self._write_target(file_path, force)
+        self._write_atomic(target, content, durable)
+        if durable:
+            _fsync_dir(target.parent)
+
+    def write_files(
+        self,
+        items: Iterable[Tuple[str, str]],
+        force: bool = False,
+        durable: bool = False,
+    ) -> None:
+        """
+        Write several files.
+
+        Protection is checked for every file before anything is written.
+        With durable, each containing directory is fsynced once after all
+        files are in place rather than once per file.
+
+        Args:
+            items: (file_path, content) pairs
+            force: Override protection check
+            durable: fsync the files and their directories before returning
+
+        Raises:
+            PermissionError: If any file is protected and force is False
+        """
+        targets = [
+            (self._write_target(path, force), content) for path, content in items
+        ]
+
+        for target, content in targets:
+            self._write_atomic(target, content, durable)
+
+        if durable:
+            for directory in {target.parent for target, _ in targets}:
+                _fsync_dir(directory)
+
+    def _write_target(self, file_path: str, force: bool) -> Path:
+        """Resolve the real path to write and check it is not protected."""
         path = self._resolve_path(file_path)
 
-        if not force and self.is_protected(str(path)):
+        # Symlinks are resolved so a link cannot bypass protection, and so
+        # the rename replaces the link target rather than the link
+        target = path.resolve()
+        if not force and self.is_protected(str(target)):
             raise PermissionError(f"File is protected: {path}")
 
+        return target
+
+    def _write_atomic(self, path: Path, content: str, durable: bool) -> None:
+        """Write content to a temporary file and rename it over path."""
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Keep an existing file's permissions; new files get the default
+        # 0o666 reduced by the umask, like a plain open()
+        try:
+            mode: Optional[int] = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = None
+
+        tmp = os.path.join(
+            str(path.parent), f".{path.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+        )
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if mode is not None:
+                os.chmod(tmp, mode)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
 
     def list_files(
         self,
@@ -98,6 +400,7 @@ class FileOperations:
         pattern: str = "*",
         recursive: bool = False,
         include_dirs: bool = False,
+        sort: bool = True,
     ) -> List[str]:
         """
         List files in directory.
@@ -107,51 +410,196 @@ class FileOperations:
             pattern: Glob pattern to match
             recursive: Search recursively
             include_dirs: Include directories in results
+            sort: Sort the results; pass False when order does not matter
 
         Returns:
             List of file paths relative to repo root
         """
+        files = self._iter_files(directory, pattern, recursive, include_dirs)
+        return sorted(files) if sort else list(files)
+
+    def _iter_files(
+        self, directory: str, pattern: str, recursive: bool, include_dirs: bool
+    ) -> Iterator[str]:
+        """Yield the unsorted results of list_files."""
         dir_path = self._resolve_path(directory)
 
         if not dir_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {dir_path}")
 
-        results = []
+        rel_prefix = self._rel_prefix(dir_path)
+        if rel_prefix is None:
+            return iter(())  # Nothing outside the repo is listed
+
+        # Name-only patterns are matched during a pruned scandir walk;
+        # path patterns keep pathlib's glob semantics
+        if "/" in pattern or "**" in pattern:
+            return self._glob_files(dir_path, pattern, recursive, include_dirs)
+
+        return self._walk(
+            str(dir_path),
+            rel_prefix,
+            self._glob_re([pattern]),
+            recursive,
+            include_dirs,
+        )
 
-        if recursive:
-            for path in dir_path.rglob(pattern):
-                if path.is_file() or (include_dirs and path.is_dir()):
-                    try:
-                        rel_path = path.relative_to(self.repo_path)
-                        results.append(str(rel_path))
-                    except ValueError:
-                        continue
-        else:
-            for path in dir_path.glob(pattern):
-                if path.is_file() or (include_dirs and path.is_dir()):
-                    try:
-                        rel_path = path.relative_to(self.repo_path)
-                        results.append(str(rel_path))
-                    except ValueError:
-                        continue
+    def _walk(
+        self,
+        dir_path: str,
+        rel_prefix: str,
+        pattern_re: Pattern[str],
+        recursive: bool,
+        include_dirs: bool,
+    ) -> Iterator[str]:
+        """
+        Yield repo-relative paths under dir_path whose names match pattern_re.
 
-        return sorted(results)
+        Directories in IGNORED_DIRS are not descended into, and symlinked
+        directories are not followed.
+        """
+        pending = [(dir_path, rel_prefix)]
 
-    def find_files(self, pattern: str, directory: str = ".") -> List[str]:
+        while pending:
+            path, prefix = pending.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+
+            for entry in entries:
+                matched = pattern_re.match(entry.name) is not None
+                if entry.is_dir(follow_symlinks=False):
+                    if include_dirs and matched:
+                        yield prefix + entry.name
+                    if recursive and entry.name not in IGNORED_DIRS:
+                        pending.append((entry.path, f"{prefix}{entry.name}{os.sep}"))
+                elif matched and (entry.is_file() or (include_dirs and entry.is_dir())):
+                    yield prefix + entry.name
+
+    def _glob_files(
+        self, dir_path: Path, pattern: str, recursive: bool, include_dirs: bool
+    ) -> Iterator[str]:
+        """Yield files matching a path pattern with pathlib globbing."""
+        root = self._repo_prefix
+        paths = dir_path.rglob(pattern) if recursive else dir_path.glob(pattern)
+
+        for path in paths:
+            if path.is_file() or (include_dirs and path.is_dir()):
+                path_str = str(path)
+                if path_str.startswith(root):
+                    yield path_str.partition(root)[2]
+
+    def find_files(
+        self, pattern: str, directory: str = ".", sort: bool = True
+    ) -> List[str]:
         """
         Find files matching pattern recursively.
 
         Args:
             pattern: Glob pattern to match
             directory: Directory to search from
+            sort: Sort the results; pass False when order does not matter
 
         Returns:
             List of matching file paths relative to repo root
         """
+        if "/" not in pattern:
+            return self.list_files(
+                directory=directory,
+                pattern=pattern,
+                recursive=True,
+                include_dirs=False,
+                sort=sort,
+            )
+
+        # Patterns with a slash are anchored at directory, so only the
+        # subtree below their literal leading components is searched
+        literal_prefix, magic_tail = _split_magic(pattern)
+        if literal_prefix:
+            directory = os.path.join(directory, literal_prefix)
+        if not self._resolve_path(directory).is_dir():
+            return []
+
+        if magic_tail == "**" or magic_tail.endswith("/**"):
+            magic_tail += "/*"  # glob's "**" alone only yields directories
+
         return self.list_files(
-            directory=directory, pattern=pattern, recursive=True, include_dirs=False
+            directory=directory,
+            pattern=magic_tail,
+            recursive=False,
+            include_dirs=False,
+            sort=sort,
         )
 
+    def find_files_multi(self, patterns: List[str], directory: str = ".") -> List[str]:
+        """
+        Find files matching any of several patterns in a single walk.
+
+        Patterns without a slash match file names at any depth; patterns
+        with a slash match the path relative to the repo root. Directories
+        in IGNORED_DIRS are not descended into.
+
+        Args:
+            patterns: Glob patterns to match
+            directory: Directory to search from
+
+        Returns:
+            Sorted list of matching file paths relative to repo root
+        """
+        name_re = self._glob_re([p for p in patterns if "/" not in p])
+        path_re = self._glob_re([p for p in patterns if "/" in p])
+
+        dir_path = self._resolve_path(directory)
+        rel_prefix = self._rel_prefix(dir_path)
+        if rel_prefix is None:
+            return []  # Nothing outside the repo is searched
+
+        results = []
+        pending = [(str(dir_path), rel_prefix)]
+
+        while pending:
+            path, prefix = pending.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        pending.append((entry.path, f"{prefix}{entry.name}{os.sep}"))
+                elif entry.is_file():
+                    if name_re and name_re.match(entry.name):
+                        results.append(prefix + entry.name)
+                    elif path_re:
+                        rel_path = prefix + entry.name
+                        if path_re.match(rel_path.replace(os.sep, "/")):
+                            results.append(rel_path)
+
+        return sorted(results)
+
+    def filter_paths(self, paths: Iterable[str], patterns: List[str]) -> List[str]:
+        """
+        Filter already-listed paths using find_files_multi matching rules.
+
+        Args:
+            paths: File paths relative to repo root
+            patterns: Glob patterns to match
+
+        Returns:
+            Paths matching any pattern, in input order
+        """
+        name_re = self._glob_re([p for p in patterns if "/" not in p])
+        path_re = self._glob_re([p for p in patterns if "/" in p])
+
+        return [
+            path
+            for path in paths
+            if (name_re and name_re.match(os.path.basename(path)))
+            or (path_re and path_re.match(path.replace(os.sep, "/")))
+        ]
+
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """
         Get file information.
@@ -164,33 +612,66 @@ class FileOperations:
         """
         path = self._resolve_path(file_path)
 
-        if not path.exists():
+        # One stat call provides size, times and file type
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {path}")
 
-        stat = path.stat()
+        relative_path = self._relative_str(path)
 
         return {
-            "path": str(path.relative_to(self.repo_path)),
-            "size": stat.st_size,
-            "modified": stat.st_mtime,
-            "is_file": path.is_file(),
-            "is_dir": path.is_dir(),
-            "protected": self.is_protected(str(path)),
+            "path": relative_path,
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "is_file": stat.S_ISREG(st.st_mode),
+            "is_dir": stat.S_ISDIR(st.st_mode),
+            "protected": self.is_protected(relative_path),
         }
 
+    def _relative_str(self, path: Path) -> str:
+        """
+        Return an absolute path inside the repo as a repo-relative string.
+
+        Raises:
+            ValueError: If the path is outside the repository
+        """
+        path_str = str(path)
+        root = self._repo_path_str
+        if path_str == root:
+            return "."
+
+        prefix = self._repo_prefix
+        if path_str.startswith(prefix):
+            return path_str.partition(prefix)[2]
+        raise ValueError(f"{path_str!r} is not in the subpath of {root!r}")
+
+    def _rel_prefix(self, dir_path: Path) -> Optional[str]:
+        """
+        Return the prefix joining a directory's entries to repo-relative paths.
+
+        Returns:
+            "" for the repo root, "sub/dir/" (with os.sep) for a directory
+            inside it, or None for a directory outside the repository
+        """
+        dir_str = str(dir_path)
+        if dir_str == self._repo_path_str:
+            return ""
+        if dir_str.startswith(self._repo_prefix):
+            return dir_str.partition(self._repo_prefix)[2] + os.sep
+        return None
+
     def _resolve_path(self, file_path: str) -> Path:
         """
         Resolve file path to absolute path within repo.
 
+        The path is normalized lexically; symlinks are not resolved, which
+        would cost a stat per path component.
+
         Args:
             file_path: Relative or absolute path
 
         Returns:
-            Resolved absolute path
+            Normalized absolute path
         """
-        path = Path(file_path)
-
-        if path.is_absolute():
-            return path
-        else:
-            return (self.repo_path / path).resolve()
+        return Path(os.path.normpath(os.path.join(self._repo_path_str, file_path)))
@@ -1,45 +1,295 @@
 """Git operations for Repoman."""
 
-from typing import List, Optional, Dict, Any
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Dict, Any, Set, Tuple, Union
 from pathlib import Path
 import git
 from git import Repo, GitCommandError
 
+# Config that lets git skip full working-tree scans on large repositories.
+# core.fsmonitor=true selects the builtin file-system monitor (git >= 2.36);
+# older versions would treat "true" as a hook command, so it is gated.
+FAST_GIT_CONFIG = {
+    "core.untrackedCache": "true",
+    "core.preloadIndex": "true",
+}
+FSMONITOR_MIN_VERSION = (2, 36)
+
+# Number of space-separated fields per changed-entry record type in
+# `git status --porcelain=v2` (1: ordinary, 2: rename/copy, u: unmerged)
+STATUS_FIELD_COUNTS = {"1": 9, "2": 10, "u": 11}
+
+# `git log` record layout: hash, author name, strict ISO committer date and
+# raw message, separated by unit separators and terminated by a record one
+LOG_FORMAT = "%H%x1f%an%x1f%cI%x1f%B%x1e"
+
+# Line prefixes that identify a unified or git diff
+DIFF_MARKERS = (b"diff --git", b"---", b"+++", b"@@")
+
 
 class GitOperations:
     """Handles git operations for the autonomous agent."""
 
-    def __init__(self, repo_path: str, auto_commit: bool = True):
+    def __init__(
+        self,
+        repo_path: Union[str, Path],
+        auto_commit: bool = True,
+        status_ttl: float = 2.0,
+        fast_config: bool = True,
+        include_untracked: bool = True,
+    ):
         """
         Initialize git operations.
 
         Args:
             repo_path: Path to git repository
             auto_commit: Whether to auto-commit changes
+            status_ttl: Seconds a cached status is served before it is
+                refreshed in the background (0 disables caching)
+            fast_config: Run git with the untracked cache, preloaded index
+                and builtin fsmonitor enabled (see FAST_GIT_CONFIG)
+            include_untracked: Default for get_status; skipping the
+                untracked scan is much faster on large repositories
         """
         self.repo_path = Path(repo_path).resolve()
         self.auto_commit = auto_commit
+        self.status_ttl = status_ttl
+        self.include_untracked = include_untracked
+
+        # Status cache keyed by include_untracked:
+        # (timestamp, index file stat, status)
+        self._status_cache: Dict[
+            bool, Tuple[float, Optional[Tuple[int, int]], Dict[str, Any]]
+        ] = {}
+        self._status_generation = 0
+        self._status_refreshing: Set[bool] = set()
+        self._status_lock = threading.Lock()
+        # Held by background status refreshes and by calls that rewrite the
+        # index, so the two never run at the same time
+        self._git_lock = threading.RLock()
 
         try:
             self.repo = Repo(self.repo_path)
         except git.exc.InvalidGitRepositoryError:
             raise ValueError(f"Not a git repository: {repo_path}")
 
-    def get_status(self) -> Dict[str, Any]:
+        self._index_path = os.path.join(self.repo.git_dir, "index")
+
+        if fast_config:
+            self._apply_fast_config()
+
+    def close(self) -> None:
+        """Stop the long-running git processes GitPython keeps for object reads."""
+        self.repo.close()
+
+    def _apply_fast_config(self) -> None:
+        """Pass FAST_GIT_CONFIG to every git command run for this repo."""
+        config = dict(FAST_GIT_CONFIG)
+        if self.repo.git.version_info[:2] >= FSMONITOR_MIN_VERSION:
+            config["core.fsmonitor"] = "true"
+
+        params = " ".join(f"'{key}={value}'" for key, value in config.items())
+        # Settings already in the environment come last so they take precedence
+        existing = os.environ.get("GIT_CONFIG_PARAMETERS")
+        if existing:
+            params = f"{params} {existing}"
+
+        self.repo.git.update_environment(GIT_CONFIG_PARAMETERS=params)
+
+    def get_status(self, include_untracked: Optional[bool] = None) -> Dict[str, Any]:
         """
         Get repository status.
 
+        Results are cached for ``status_ttl`` seconds. After that the last
+        result is still returned immediately while a background thread
+        refreshes it (stale-while-revalidate). Changes made through this
+        class, or anything else that rewrites the git index, invalidate
+        the cache.
+
+        Args:
+            include_untracked: Scan for untracked files (defaults to the
+                include_untracked constructor setting)
+
+        Returns:
+            Dictionary with status information
+        """
+        if include_untracked is None:
+            include_untracked = self.include_untracked
+
+        if self.status_ttl <= 0:
+            return self._query_status(include_untracked)
+
+        with self._status_lock:
+            cached = self._status_cache.get(include_untracked)
+
+        if cached is None or cached[1] != self._index_stat():
+            return self._refresh_status(include_untracked)
+
+        timestamp, _, status = cached
+        if time.monotonic() - timestamp > self.status_ttl:
+            self._schedule_status_refresh(include_untracked)
+        return status
+
+    def invalidate_status(self) -> None:
+        """Drop cached status so the next get_status queries git."""
+        with self._status_lock:
+            self._status_generation += 1
+            self._status_cache.clear()
+
+    @contextmanager
+    def _mutating(self) -> Iterator[None]:
+        """Hold off background status refreshes while git rewrites the index."""
+        with self._git_lock:
+            try:
+                yield
+            finally:
+                self.invalidate_status()
+
+    def _query_status(
+        self, include_untracked: bool, optional_locks: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Query repository status with a single git status call.
+
+        Args:
+            include_untracked: Scan for untracked files
+            optional_locks: Let git take index.lock to write refreshed stat
+                information back; background queries turn this off so they
+                never contend with other git commands
+
+        Returns:
+            Dictionary with status information
+        """
+        output = self.repo.git.status(
+            "--porcelain=v2",
+            "--branch",
+            "--no-ahead-behind",
+            "-z",
+            untracked_files="all" if include_untracked else "no",
+            env=None if optional_locks else {"GIT_OPTIONAL_LOCKS": "0"},
+        )
+        return self._parse_status(output)
+
+    def _parse_status(self, output: str) -> Dict[str, Any]:
+        """
+        Parse NUL-delimited ``git status --porcelain=v2 --branch`` output.
+
+        Args:
+            output: Raw status output
+
         Returns:
             Dictionary with status information
         """
+        branch = None
+        untracked: List[str] = []
+        modified: List[str] = []
+        staged: List[str] = []
+
+        records = iter(output.split("\0"))
+        for record in records:
+            if not record:
+                continue
+
+            kind = record[0]
+            if kind == "#":
+                if record.startswith("# branch.head "):
+                    branch = record.split(" ", 2)[2]
+            elif kind == "?":
+                untracked.append(record[2:])
+            elif kind in STATUS_FIELD_COUNTS:
+                fields = record.split(" ", STATUS_FIELD_COUNTS[kind] - 1)
+                index_status, worktree_status = fields[1]
+                path = fields[-1]
+                if kind == "2":
+                    # Renames and copies are followed by the original path
+                    next(records, None)
+                if index_status != ".":
+                    staged.append(path)
+                if worktree_status != ".":
+                    modified.append(path)
+
         return {
-            "branch": self.repo.active_branch.name,
-            "is_dirty": self.repo.is_dirty(),
-            "untracked": self.repo.untracked_files,
-            "modified": [item.a_path for item in self.repo.index.diff(None)],
-            "staged": [item.a_path for item in self.repo.index.diff("HEAD")],
+            "branch": branch,
+            "is_dirty": bool(modified or staged),
+            "untracked": untracked,
+            "modified": modified,
+            "staged": staged,
         }
 
+    def _refresh_status(
+        self, include_untracked: bool, optional_locks: bool = True
+    ) -> Dict[str, Any]:
+        """Query status and store it unless the cache was invalidated meanwhile."""
+        with self._status_lock:
+            generation = self._status_generation
+
+        status = self._query_status(include_untracked, optional_locks)
+        # Taken after the query, since git status may itself rewrite the index
+        index_stat = self._index_stat()
+
+        with self._status_lock:
+            if generation == self._status_generation:
+                self._status_cache[include_untracked] = (
+                    time.monotonic(),
+                    index_stat,
+                    status,
+                )
+        return status
+
+    def _index_stat(self) -> Optional[Tuple[int, int]]:
+        """Return the git index file's mtime and size, or None if it is missing."""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _schedule_status_refresh(self, include_untracked: bool) -> None:
+        """Refresh cached status in a background thread."""
+        with self._status_lock:
+            if include_untracked in self._status_refreshing:
+                return
+            self._status_refreshing.add(include_untracked)
+
+        thread = threading.Thread(
+            target=self._background_status_refresh,
+            args=(include_untracked,),
+            daemon=True,
+        )
+        thread.start()
+
+    def _background_status_refresh(self, include_untracked: bool) -> None:
+        """Background refresh; a failed query keeps the last good status."""
+        try:
+            with self._git_lock:
+                self._refresh_status(include_untracked, optional_locks=False)
+        except Exception:
+            pass
+        finally:
+            with self._status_lock:
+                self._status_refreshing.discard(include_untracked)
+
+    def ls_files(self, patterns: Optional[List[str]] = None) -> List[str]:
+        """
+        List tracked and untracked, non-ignored files from the git index.
+
+        Much faster than walking the working tree on large repositories.
+
+        Args:
+            patterns: Git pathspecs to match (e.g. '*.py'); all files if None
+
+        Returns:
+            Sorted list of file paths relative to repo root
+        """
+        output = self.repo.git.ls_files(
+            "-z", "--cached", "--others", "--exclude-standard", "--", *(patterns or [])
+        )
+        return sorted(set(path for path in output.split("\0") if path))
+
     def get_diff(self, staged: bool = False) -> str:
         """
         Get git diff.
@@ -55,6 +305,49 @@ class GitOperations:
         else:
             return self.repo.git.diff()
 
+    def get_diff_summary(self, staged: bool = False, max_bytes: int = 64 * 1024) -> str:
+        """
+        Get a size-bounded diff: the --stat summary followed by the head of
+        the patch.
+
+        The patch is streamed from git and the process is stopped once
+        max_bytes have been read, so large diffs are never fully loaded.
+
+        Args:
+            staged: Get diff of staged changes
+            max_bytes: Maximum number of patch bytes to include
+
+        Returns:
+            Diff summary, or an empty string if there are no changes
+        """
+        args = ["--cached"] if staged else []
+
+        stat = self.repo.git.diff("--stat", *args)
+        if not stat:
+            return ""
+
+        # Keep the GitPython handle alive while reading: releasing it closes
+        # the process pipes
+        handle = self.repo.git.diff(*args, as_process=True)
+        chunks: List[bytes] = []
+        size = 0
+        truncated = False
+        try:
+            for line in handle.proc.stdout:
+                if size + len(line) > max_bytes:
+                    truncated = True
+                    break
+                chunks.append(line)
+                size += len(line)
+        finally:
+            handle.proc.kill()
+            handle.proc.wait()
+
+        patch = b"".join(chunks).decode("utf-8", errors="replace").rstrip("\n")
+        if truncated:
+            patch += f"\n... diff truncated after {max_bytes} bytes"
+        return f"{stat}\n\n{patch}"
+
     def add_files(self, files: Optional[List[str]] = None) -> None:
         """
         Stage files for commit.
@@ -62,10 +355,11 @@ class GitOperations:
         Args:
             files: List of file paths (relative to repo). If None, adds all.
         """
-        if files:
-            self.repo.index.add(files)
-        else:
-            self.repo.git.add(A=True)
+        with self._mutating():
+            if files:
+                self.repo.git.add("--", *files)
+            else:
+                self.repo.git.add(A=True)
 
     def commit(self, message: str, files: Optional[List[str]] = None) -> str:
         """
@@ -81,18 +375,23 @@ class GitOperations:
         Raises:
             ValueError: If nothing to commit
         """
-        if files:
-            self.add_files(files)
+        with self._mutating():
+            if files:
+                self.add_files(files)
+
+            # Any output, including untracked files, means there is something
+            # to commit
+            if not self.repo.git.status("--porcelain", "-z"):
+                raise ValueError("Nothing to commit")
 
-        if not self.repo.is_dirty() and not self.repo.untracked_files:
-            raise ValueError("Nothing to commit")
+            if files is None and not self.is_staged():
+                # Stage all changes if nothing staged and no files specified
+                self.add_files()
 
-        if files is None and not self.is_staged():
-            # Stage all changes if nothing staged and no files specified
-            self.add_files()
+            self.repo.git.commit("--quiet", "-m", message)
 
-        commit = self.repo.index.commit(message)
-        return commit.hexsha
+        # Resolve HEAD from the ref files in-process instead of spawning rev-parse
+        return self.repo.head.commit.hexsha
 
     def is_staged(self) -> bool:
         """
@@ -101,7 +400,14 @@ class GitOperations:
         Returns:
             True if changes are staged
         """
-        return len(list(self.repo.index.diff("HEAD"))) > 0
+        # --quiet exits with 1 when there are differences, without printing them
+        try:
+            self.repo.git.diff("--cached", "--quiet")
+        except GitCommandError as e:
+            if e.status == 1:
+                return True
+            raise
+        return False
 
     def create_branch(self, branch_name: str, checkout: bool = True) -> None:
         """
@@ -113,7 +419,8 @@ class GitOperations:
         """
         new_branch = self.repo.create_head(branch_name)
         if checkout:
-            new_branch.checkout()
+            with self._mutating():
+                new_branch.checkout()
 
     def checkout_branch(self, branch_name: str, create: bool = False) -> None:
         """
@@ -126,7 +433,8 @@ class GitOperations:
         if create and branch_name not in self.repo.heads:
             self.create_branch(branch_name)
         else:
-            self.repo.heads[branch_name].checkout()
+            with self._mutating():
+                self.repo.heads[branch_name].checkout()
 
     def push(self, remote: str = "origin", branch: Optional[str] = None) -> None:
         """
@@ -163,41 +471,74 @@ class GitOperations:
             "base": "main",
         }
 
-    def apply_diff(self, diff_content: str, validate: bool = True) -> None:
+    def apply_diff(
+        self,
+        diff_content: Union[str, bytes],
+        validate: bool = True,
+        fast: bool = True,
+    ) -> None:
         """
-        Apply a git diff.
+        Apply a git diff to the working tree and index.
 
         Args:
             diff_content: Diff content to apply
             validate: Whether to validate diff before applying (recommended)
+            fast: Try a plain ``git apply --index`` first and only fall back
+                to the slower three-way merge if that fails
 
         Raises:
             GitCommandError: If diff cannot be applied
             ValueError: If diff validation fails
         """
+        data = diff_content.encode() if isinstance(diff_content, str) else diff_content
+
         if validate:
             # Basic validation: check if diff looks valid
-            if not diff_content.strip():
+            if not data.strip():
                 raise ValueError("Empty diff content")
 
-            # Check for common git diff markers
-            lines = diff_content.split("\n")
-            has_diff_marker = any(
-                line.startswith(("diff --git", "---", "+++", "@@")) for line in lines
+            # Check for common git diff markers at the start of a line
+            has_diff_marker = data.startswith(DIFF_MARKERS) or any(
+                b"\n" + marker in data for marker in DIFF_MARKERS
             )
             if not has_diff_marker:
                 raise ValueError("Invalid diff format: missing git diff markers")
 
         try:
-            # Use --check first to validate without applying
-            if validate:
-                self.repo.git.apply(["--check", "--3way"], input=diff_content.encode())
-
-            # Actually apply the diff
-            self.repo.git.apply(["--3way"], input=diff_content.encode())
+            with self._mutating():
+                if fast:
+                    # A plain apply is all-or-nothing, so no separate check is
+                    # needed
+                    try:
+                        self._apply(data, "--index")
+                        return
+                    except GitCommandError:
+                        pass
+
+                # Use --check first to validate without applying
+                if validate:
+                    self._apply(data, "--check", "--3way")
+
+                # Actually apply the diff
+                self._apply(data, "--3way")
         except GitCommandError as e:
             raise GitCommandError(f"Failed to apply diff: {e}")
 
+    def _apply(self, data: bytes, *args: str) -> None:
+        """Run ``git apply`` with the diff passed on stdin."""
+        handle = self.repo.git.apply(
+            "--whitespace=nowarn",
+            *args,
+            "-",
+            istream=subprocess.PIPE,
+            as_process=True,
+        )
+        _, stderr = handle.proc.communicate(data)
+        if handle.proc.returncode != 0:
+            raise GitCommandError(
+                ["git", "apply", *args], handle.proc.returncode, stderr
+            )
+
     def get_recent_commits(self, count: int = 10) -> List[Dict[str, Any]]:
         """
         Get recent commits.
@@ -208,17 +549,7 @@ class GitOperations:
         Returns:
             List of commit information dictionaries
         """
-        commits = []
-        for commit in list(self.repo.iter_commits())[:count]:
-            commits.append(
-                {
-                    "sha": commit.hexsha,
-                    "message": commit.message.strip(),
-                    "author": str(commit.author),
-                    "date": commit.committed_datetime.isoformat(),
-                }
-            )
-        return commits
+        return self._log(count)
 
     def reset_changes(self, hard: bool = False) -> None:
         """
@@ -227,10 +558,11 @@ class GitOperations:
         Args:
             hard: Perform hard reset (discard all changes)
         """
-        if hard:
-            self.repo.git.reset("--hard")
-        else:
-            self.repo.git.reset()
+        with self._mutating():
+            if hard:
+                self.repo.git.reset("--hard")
+            else:
+                self.repo.git.reset()
 
     def get_file_history(self, file_path: str, count: int = 5) -> List[Dict[str, Any]]:
         """
@@ -243,14 +575,38 @@ class GitOperations:
         Returns:
             List of commit information for the file
         """
+        commits = self._log(count, file_path)
+        for commit in commits:
+            commit["sha"] = commit["sha"][:8]
+        return commits
+
+    def _log(self, count: int, *paths: str) -> List[Dict[str, Any]]:
+        """
+        Read commit information with a single git log call.
+
+        Args:
+            count: Maximum number of commits
+            *paths: Limit history to these paths
+
+        Returns:
+            List of commit information dictionaries, newest first
+        """
+        output = self.repo.git.log(
+            f"--max-count={count}", f"--format={LOG_FORMAT}", "--", *paths
+        )
+
         commits = []
-        for commit in list(self.repo.iter_commits(paths=file_path))[:count]:
+        for record in output.split("\x1e"):
+            record = record.lstrip("\n")
+            if not record:
+                continue
+            sha, author, date, message = record.split("\x1f", 3)
             commits.append(
                 {
-                    "sha": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "author": str(commit.author),
-                    "date": commit.committed_datetime.isoformat(),
+                    "sha": sha,
+                    "message": message.strip(),
+                    "author": author,
+                    "date": date,
                 }
             )
         return commits
@@ -1,10 +1,225 @@
 """LLM integration for Repoman."""
 
+import asyncio
+import functools
+import importlib.util
+import json
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional
 from abc import ABC, abstractmethod
 
 
+def create_http_client(
+    provider: str = "openai",
+    max_connections: int = 32,
+    keepalive_expiry: float = 60.0,
+    http2: Optional[bool] = None,
+) -> Any:
+    """
+    Create a pooled HTTP client to share across LLM requests.
+
+    Reusing one client keeps TCP/TLS connections alive between calls
+    instead of paying a fresh handshake per request. The client is built
+    from the provider SDK's own default client class so it stays
+    compatible with the HTTP library that SDK ships with.
+
+    Args:
+        provider: Provider name ('openai' or 'anthropic')
+        max_connections: Maximum number of pooled connections
+        keepalive_expiry: Seconds an idle connection is kept open
+        http2: Multiplex requests over HTTP/2 (defaults to enabled when
+            the h2 package is installed)
+
+    Returns:
+        HTTP client accepted by the provider SDK
+    """
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("httpx package required. Install with: pip install httpx")
+
+    provider = provider.lower()
+    if provider == "openai":
+        try:
+            from openai import DefaultHttpxClient
+        except ImportError:
+            raise ImportError(
+                "openai package required. Install with: pip install openai"
+            )
+    elif provider == "anthropic":
+        try:
+            from anthropic import DefaultHttpxClient
+        except ImportError:
+            raise ImportError(
+                "anthropic package required. Install with: pip install anthropic"
+            )
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    if http2 is None:
+        http2 = importlib.util.find_spec("h2") is not None
+
+    return DefaultHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+
+
+def _summarize_diff(diff: str, max_chars: int = 8000, keep_lines: int = 20) -> str:
+    """
+    Shrink a diff to fit a prompt budget.
+
+    Each file keeps its header and the first and last keep_lines lines of
+    its hunks. Per-file added/removed line counts are listed first unless
+    the diff already starts with a summary such as ``git diff --stat``.
+
+    Args:
+        diff: Diff text, optionally preceded by a summary
+        max_chars: Maximum length of the result
+        keep_lines: Hunk lines kept at each end of a file's changes
+
+    Returns:
+        The diff itself if it fits, otherwise the shortened summary
+    """
+    if len(diff) <= max_chars:
+        return diff
+
+    preamble, *files = ("\n" + diff).split("\ndiff --git ")
+    stats = []
+    sections = []
+    for section in files:
+        lines = section.split("\n")
+        hunk_start = next(
+            (i for i, line in enumerate(lines) if line.startswith("@@")), len(lines)
+        )
+        body = lines[hunk_start:]
+        added = sum(1 for line in body if line.startswith("+"))
+        removed = sum(1 for line in body if line.startswith("-"))
+        stats.append(f" {lines[0].rpartition(' b/')[2]} | +{added} -{removed}")
+
+        if len(body) > 2 * keep_lines:
+            omitted = len(body) - 2 * keep_lines
+            body = [
+                *body[:keep_lines],
+                f"... {omitted} lines omitted ...",
+                *body[-keep_lines:],
+            ]
+        sections.append(
+            "\n".join(["diff --git " + lines[0], *lines[1:hunk_start], *body])
+        )
+
+    preamble = preamble.strip("\n")
+    summary = "\n".join([preamble or "\n".join(stats), "", *sections])
+    if len(summary) > max_chars:
+        summary = summary[:max_chars] + "\n... diff truncated ..."
+    return summary
+
+
+def _parse_batch_analysis(response: str, files: Dict[str, str]) -> Dict[str, str]:
+    """
+    Parse a batched analysis response.
+
+    Args:
+        response: Raw LLM response
+        files: Files that were sent in the request
+
+    Returns:
+        Mapping of file path to analysis
+
+    Raises:
+        ValueError: If the response is not a JSON object covering every file
+    """
+    start = response.find("{")
+    end = response.rfind("}") + 1
+    if start == -1 or end <= start:
+        raise ValueError("Batch response does not contain a JSON object")
+
+    try:
+        parsed = json.loads(response[start:end])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid batch response: {e}")
+
+    if not isinstance(parsed, dict):
+        raise ValueError("Batch response is not a JSON object")
+
+    missing = [path for path in files if path not in parsed]
+    if missing:
+        raise ValueError(f"Batch response missing files: {missing}")
+
+    return {path: str(parsed[path]) for path in files}
+
+
+class RateLimiter:
+    """
+    Thread-safe token-bucket limiter for requests and tokens per minute.
+
+    Each bucket holds up to one minute of budget and refills continuously,
+    so short bursts are allowed while the average rate stays under the
+    provider limits. Callers block until their request fits.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm: Requests per minute (0 for unlimited)
+            tpm: Tokens per minute (0 for unlimited)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until a request using the given number of tokens is allowed.
+
+        Args:
+            tokens: Estimated tokens for the request (prompt and completion)
+        """
+        if self.rpm <= 0 and self.tpm <= 0:
+            return
+
+        # A request larger than the whole bucket only has to wait for a full one
+        tokens = min(tokens, self.tpm) if self.tpm > 0 else 0
+
+        # Waiters hold the lock while sleeping so they are served in turn
+        with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm > 0 and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm > 0 and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                time.sleep(wait)
+
+            if self.rpm > 0:
+                self._requests -= 1
+            self._tokens -= tokens
+
+    def _refill(self) -> None:
+        """Add the budget accrued since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm > 0:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm > 0:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -13,17 +228,53 @@ class LLMProvider(ABC):
         """Generate text from prompt."""
         pass
 
+    def close(self) -> None:
+        """Close the HTTP client if the provider created it."""
+        if getattr(self, "_owns_http_client", False):
+            self.http_client.close()
+            self._owns_http_client = False
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        Generate text without blocking the event loop.
+
+        The blocking SDK call runs in the default executor, so concurrent
+        requests share the provider's pooled HTTP client.
+
+        Args:
+            prompt: Input prompt
+            **kwargs: Override default parameters
+
+        Returns:
+            Generated text
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.generate, prompt, **kwargs)
+        )
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4", **kwargs):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        http_client: Optional[Any] = None,
+        max_retries: int = 3,
+        **kwargs,
+    ):
         """
         Initialize OpenAI provider.
 
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             model: Model name
+            http_client: Pooled HTTP client (see create_http_client); the
+                provider creates and owns one if not given
+            max_retries: Retries on rate limits and server errors, with
+                exponential backoff handled by the SDK
             **kwargs: Additional parameters for the model
         """
         try:
@@ -37,7 +288,15 @@ class OpenAIProvider(LLMProvider):
         if not self.api_key:
             raise ValueError("OpenAI API key not provided")
 
-        self.client = OpenAI(api_key=self.api_key)
+        # Keep connections warm across calls even without a shared client
+        self._owns_http_client = http_client is None
+        if http_client is None:
+            http_client = create_http_client(provider="openai")
+        self.http_client = http_client
+
+        self.client = OpenAI(
+            api_key=self.api_key, http_client=http_client, max_retries=max_retries
+        )
         self.model = model
         self.kwargs = kwargs
 
@@ -73,6 +332,8 @@ class AnthropicProvider(LLMProvider):
         self,
         api_key: Optional[str] = None,
         model: str = "claude-3-sonnet-20240229",
+        http_client: Optional[Any] = None,
+        max_retries: int = 3,
         **kwargs,
     ):
         """
@@ -81,6 +342,10 @@ class AnthropicProvider(LLMProvider):
         Args:
             api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
             model: Model name
+            http_client: Pooled HTTP client (see create_http_client); the
+                provider creates and owns one if not given
+            max_retries: Retries on rate limits and server errors, with
+                exponential backoff handled by the SDK
             **kwargs: Additional parameters for the model
         """
         try:
@@ -94,7 +359,15 @@ class AnthropicProvider(LLMProvider):
         if not self.api_key:
             raise ValueError("Anthropic API key not provided")
 
-        self.client = Anthropic(api_key=self.api_key)
+        # Keep connections warm across calls even without a shared client
+        self._owns_http_client = http_client is None
+        if http_client is None:
+            http_client = create_http_client(provider="anthropic")
+        self.http_client = http_client
+
+        self.client = Anthropic(
+            api_key=self.api_key, http_client=http_client, max_retries=max_retries
+        )
         self.model = model
         self.kwargs = kwargs
 
@@ -126,26 +399,49 @@ class AnthropicProvider(LLMProvider):
 class LLMClient:
     """Main LLM client that manages providers."""
 
-    def __init__(self, provider: str = "openai", model: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        http_client: Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        **kwargs,
+    ):
         """
         Initialize LLM client.
 
         Args:
             provider: Provider name ('openai' or 'anthropic')
             model: Model name (provider-specific default if not provided)
+            http_client: Pooled HTTP client; closed together with this client
+            rate_limiter: Limiter applied before every request
             **kwargs: Additional parameters for the provider
         """
         self.provider_name = provider.lower()
+        self.http_client = http_client
+        self.rate_limiter = rate_limiter
+        self._encoding: Any = None
 
         if self.provider_name == "openai":
             model = model or "gpt-4"
-            self.provider = OpenAIProvider(model=model, **kwargs)
+            self.provider = OpenAIProvider(
+                model=model, http_client=http_client, **kwargs
+            )
         elif self.provider_name == "anthropic":
             model = model or "claude-3-sonnet-20240229"
-            self.provider = AnthropicProvider(model=model, **kwargs)
+            self.provider = AnthropicProvider(
+                model=model, http_client=http_client, **kwargs
+            )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
+    def close(self) -> None:
+        """Close the pooled HTTP client, if any."""
+        self.provider.close()
+        if self.http_client is not None:
+            self.http_client.close()
+            self.http_client = None
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Generate text using the configured provider.
@@ -157,8 +453,60 @@ class LLMClient:
         Returns:
             Generated text
         """
+        self._throttle(prompt, kwargs)
         return self.provider.generate(prompt, **kwargs)
 
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        Generate text asynchronously using the configured provider.
+
+        Args:
+            prompt: Input prompt
+            **kwargs: Override default parameters
+
+        Returns:
+            Generated text
+        """
+        if self.rate_limiter is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._throttle, prompt, kwargs)
+        return await self.provider.agenerate(prompt, **kwargs)
+
+    async def generate_many(
+        self, prompts: List[str], concurrency: int = 8, **kwargs
+    ) -> List[str]:
+        """
+        Generate text for several prompts concurrently.
+
+        Args:
+            prompts: Input prompts
+            concurrency: Maximum number of requests in flight
+            **kwargs: Override default parameters
+
+        Returns:
+            Generated texts, in the same order as prompts
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(prompt: str) -> str:
+            async with semaphore:
+                return await self.agenerate(prompt, **kwargs)
+
+        return list(await asyncio.gather(*(run(prompt) for prompt in prompts)))
+
+    def _throttle(self, prompt: str, kwargs: Dict[str, Any]) -> None:
+        """Wait for the rate limiter, budgeting prompt plus completion tokens."""
+        if self.rate_limiter is None:
+            return
+
+        tokens = 0
+        if self.rate_limiter.tpm > 0:
+            max_tokens = kwargs.get(
+                "max_tokens", self.provider.kwargs.get("max_tokens", 2000)
+            )
+            tokens = self.count_tokens(prompt) + max_tokens
+        self.rate_limiter.acquire(tokens)
+
     def generate_code_analysis(self, code: str, task: str) -> str:
         """
         Analyze code and generate suggestions.
@@ -170,16 +518,11 @@ class LLMClient:
         Returns:
             Analysis and suggestions
         """
-        prompt = f"""Analyze the following code and provide suggestions for: {task}
-
-Code:
-```
-{code}
-```
+        return self.generate(self._code_analysis_prompt(code, task))
 
-Provide a clear analysis and actionable suggestions."""
-
-        return self.generate(prompt)
+    async def agenerate_code_analysis(self, code: str, task: str) -> str:
+        """Async variant of generate_code_analysis."""
+        return await self.agenerate(self._code_analysis_prompt(code, task))
 
     def generate_code_refactor(self, code: str, instructions: str) -> str:
         """
@@ -192,7 +535,79 @@ Provide a clear analysis and actionable suggestions."""
         Returns:
             Refactored code
         """
-        prompt = f"""Refactor the following code according to these
+        return self.generate(self._code_refactor_prompt(code, instructions))
+
+    async def agenerate_code_refactor(self, code: str, instructions: str) -> str:
+        """Async variant of generate_code_refactor."""
+        return await self.agenerate(self._code_refactor_prompt(code, instructions))
+
+    def generate_batch_analysis(
+        self, files: Dict[str, str], task: str
+    ) -> Dict[str, str]:
+        """
+        Analyze several files in a single request.
+
+        Args:
+            files: Mapping of file path to content
+            task: Task description
+
+        Returns:
+            Mapping of file path to analysis
+
+        Raises:
+            ValueError: If the response cannot be parsed for every file
+        """
+        response = self.generate(self._batch_analysis_prompt(files, task))
+        return _parse_batch_analysis(response, files)
+
+    async def agenerate_batch_analysis(
+        self, files: Dict[str, str], task: str
+    ) -> Dict[str, str]:
+        """Async variant of generate_batch_analysis."""
+        response = await self.agenerate(self._batch_analysis_prompt(files, task))
+        return _parse_batch_analysis(response, files)
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count prompt tokens for text.
+
+        Uses tiktoken when it is installed and knows the model, otherwise
+        falls back to an estimate of four characters per token.
+
+        Args:
+            text: Text to measure
+
+        Returns:
+            Token count
+        """
+        if self._encoding is None:
+            self._encoding = False
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.encoding_for_model(self.provider.model)
+            except Exception:
+                # Missing package, unknown model, or the encoding download failed
+                pass
+
+        if self._encoding:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def _code_analysis_prompt(self, code: str, task: str) -> str:
+        """Build the prompt for code analysis."""
+        return f"""Analyze the following code and provide suggestions for: {task}
+
+Code:
+```
+{code}
+```
+
+Provide a clear analysis and actionable suggestions."""
+
+    def _code_refactor_prompt(self, code: str, instructions: str) -> str:
+        """Build the prompt for code refactoring."""
+        return f"""Refactor the following code according to these
 instructions: {instructions}
 
 Original code:
@@ -202,14 +617,30 @@ Original code:
 
 Provide ONLY the refactored code without explanations."""
 
-        return self.generate(prompt)
+    def _batch_analysis_prompt(self, files: Dict[str, str], task: str) -> str:
+        """Build a prompt that marshals several files into one request."""
+        blocks = "\n".join(
+            f"<<FILE path={path}>>\n{content}\n<<END>>"
+            for path, content in files.items()
+        )
+        return f"""Analyze each of the following files and provide suggestions
+for: {task}
+
+{blocks}
 
-    def generate_commit_message(self, diff: str) -> str:
+Respond with ONLY a JSON object mapping each file path to a concise
+analysis with actionable suggestions."""
+
+    def generate_commit_message(self, diff: str, max_chars: int = 8000) -> str:
         """
         Generate a commit message from git diff.
 
+        Large diffs are shortened to per-file heads and tails first, so the
+        request stays small however big the change is.
+
         Args:
             diff: Git diff output
+            max_chars: Maximum diff characters sent in the prompt
 
         Returns:
             Commit message
@@ -217,7 +648,7 @@ Provide ONLY the refactored code without explanations."""
         prompt = f"""Generate a concise commit message for the following changes:
 
 ```
-{diff}
+{_summarize_diff(diff, max_chars)}
 ```
 
 Provide only the commit message in conventional commit format."""
@@ -1,63 +1,139 @@
 """Test and script runner for Repoman."""
 
+import os
+import shlex
+import signal
 import subprocess
 import sys
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, FrozenSet, IO, Optional, List, Tuple, Union
 from pathlib import Path
 
+# Commands are either a shell string or an argv list run without a shell
+Command = Union[str, List[str]]
+
+# Read buffer for command output pipes, so chatty commands are drained in
+# a few large reads
+PIPE_BUFFER_SIZE = 16 * 1024
+
 
 class Runner:
     """Handles running tests and scripts."""
 
-    def __init__(self, repo_path: str, timeout: int = 300):
+    def __init__(
+        self,
+        repo_path: Union[str, Path],
+        timeout: Optional[float] = 300,
+        max_lines: Optional[int] = 10000,
+    ):
         """
         Initialize runner.
 
         Args:
             repo_path: Path to repository
-            timeout: Default timeout in seconds
+            timeout: Default timeout in seconds (None for no limit)
+            max_lines: Lines of stdout and stderr kept per command; older
+                lines are dropped (None keeps everything)
         """
         self.repo_path = Path(repo_path).resolve()
         self.timeout = timeout
+        self.max_lines = max_lines
+        # (mtime_ns, names) of the repo root, used by command detection
+        self._root_cache: Optional[Tuple[int, FrozenSet[str]]] = None
+
+    def _root_entries(self) -> FrozenSet[str]:
+        """
+        Get the names in the repository root.
+
+        The listing is cached and only re-read when the root directory's
+        mtime changes, i.e. when an entry is added, removed or renamed.
+
+        Returns:
+            Set of entry names
+        """
+        try:
+            mtime = os.stat(self.repo_path).st_mtime_ns
+        except OSError:
+            return frozenset()
+
+        cached = self._root_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        names = frozenset(os.listdir(self.repo_path))
+        self._root_cache = (mtime, names)
+        return names
 
     def run_command(
         self,
-        command: str,
+        command: Command,
         cwd: Optional[str] = None,
-        timeout: Optional[int] = None,
+        timeout: Optional[float] = None,
         env: Optional[Dict[str, str]] = None,
+        full_capture: bool = False,
+        input: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Run a shell command.
+        Run a command.
+
+        A string is run through the shell; an argv list is executed
+        directly, which skips starting /bin/sh. The command runs in its own
+        process group so a timeout also stops any children it started.
+
+        Output is read as it is produced and only the last max_lines lines
+        of each stream are kept, so memory stays bounded on noisy commands.
 
         Args:
-            command: Command to run
+            command: Shell command string or argv list
             cwd: Working directory (defaults to repo root)
-            timeout: Timeout in seconds
+            timeout: Timeout in seconds (defaults to the runner's timeout;
+                None for no limit)
             env: Environment variables
+            full_capture: Keep all output instead of the last max_lines
+            input: Text written to the command's stdin
 
         Returns:
             Dictionary with returncode, stdout, stderr
         """
         work_dir = Path(cwd) if cwd else self.repo_path
         timeout = timeout or self.timeout
+        max_lines = None if full_capture else self.max_lines
 
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=work_dir,
-                timeout=timeout,
-                capture_output=True,
-                text=True,
-                env=env,
-            )
+            process = self._popen(command, work_dir, env, stdin=input is not None)
+            try:
+                stdout: deque = deque(maxlen=max_lines)
+                stderr: deque = deque(maxlen=max_lines)
+                readers = [
+                    _start_reader(process.stdout, stdout),
+                    _start_reader(process.stderr, stderr),
+                ]
+                if input is not None:
+                    _start_writer(process.stdin, input)
+
+                deadline = None if timeout is None else time.monotonic() + timeout
+                process.wait(timeout=timeout)
+                for reader in readers:
+                    # Pipes stay open while children of the command run
+                    if deadline is None:
+                        reader.join()
+                    else:
+                        reader.join(max(deadline - time.monotonic(), 0))
+                    if reader.is_alive():
+                        raise subprocess.TimeoutExpired(command, timeout)
+            except BaseException:
+                # Never leave the command running when collecting it fails
+                self._kill(process)
+                process.wait()
+                raise
 
             return {
-                "success": result.returncode == 0,
-                "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
+                "success": process.returncode == 0,
+                "returncode": process.returncode,
+                "stdout": "".join(stdout),
+                "stderr": "".join(stderr),
             }
         except subprocess.TimeoutExpired:
             return {
@@ -74,9 +150,47 @@ class Runner:
                 "stderr": str(e),
             }
 
+    def _popen(
+        self,
+        command: Command,
+        cwd: Path,
+        env: Optional[Dict[str, str]],
+        stdin: bool = False,
+    ) -> subprocess.Popen:
+        """
+        Start a command with piped text output in its own session.
+
+        Output is decoded as UTF-8 with undecodable bytes replaced, so a
+        stray byte never stops the reader threads.
+        """
+        return subprocess.Popen(
+            command,
+            shell=isinstance(command, str),
+            cwd=cwd,
+            stdin=subprocess.PIPE if stdin else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=PIPE_BUFFER_SIZE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=env,
+            start_new_session=True,
+        )
+
+    def _kill(self, process: subprocess.Popen) -> None:
+        """Kill a process and the process group it leads."""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+            except OSError:
+                pass
+        process.kill()
+
     def run_tests(
         self,
-        test_command: Optional[str] = None,
+        test_command: Optional[Command] = None,
         test_path: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
@@ -93,36 +207,39 @@ class Runner:
             test_command = self._detect_test_command()
 
         if test_path:
-            test_command = f"{test_command} {test_path}"
+            if isinstance(test_command, str):
+                test_command = f"{test_command} {test_path}"
+            else:
+                test_command = [*test_command, test_path]
 
         result = self.run_command(test_command)
-        result["test_command"] = test_command
+        result["test_command"] = _display(test_command)
 
         return result
 
-    def _detect_test_command(self) -> str:
+    def _detect_test_command(self) -> List[str]:
         """
         Auto-detect test command based on project structure.
 
         Returns:
-            Test command string
+            Test command argv
         """
+        names = self._root_entries()
+
         # Check for common test frameworks
-        if (self.repo_path / "pytest.ini").exists() or (
-            self.repo_path / "setup.py"
-        ).exists():
-            return "pytest"
-        elif (self.repo_path / "package.json").exists():
-            return "npm test"
-        elif (self.repo_path / "Makefile").exists():
-            return "make test"
-        elif (self.repo_path / "tox.ini").exists():
-            return "tox"
+        if "pytest.ini" in names or "setup.py" in names:
+            return ["pytest"]
+        elif "package.json" in names:
+            return ["npm", "test"]
+        elif "Makefile" in names:
+            return ["make", "test"]
+        elif "tox.ini" in names:
+            return ["tox"]
         else:
             # Default to pytest for Python projects
-            return "pytest"
+            return ["pytest"]
 
-    def run_linter(self, linter_command: Optional[str] = None) -> Dict[str, Any]:
+    def run_linter(self, linter_command: Optional[Command] = None) -> Dict[str, Any]:
         """
         Run linter.
 
@@ -136,32 +253,32 @@ class Runner:
             linter_command = self._detect_linter_command()
 
         result = self.run_command(linter_command)
-        result["linter_command"] = linter_command
+        result["linter_command"] = _display(linter_command)
 
         return result
 
-    def _detect_linter_command(self) -> str:
+    def _detect_linter_command(self) -> List[str]:
         """
         Auto-detect linter command based on project structure.
 
         Returns:
-            Linter command string
+            Linter command argv
         """
+        names = self._root_entries()
+
         # Check for Python linters
-        if (self.repo_path / ".flake8").exists():
-            return "flake8"
-        elif (self.repo_path / "pylint.rc").exists():
-            return "pylint"
-        elif (self.repo_path / ".eslintrc.js").exists() or (
-            self.repo_path / ".eslintrc.json"
-        ).exists():
-            return "eslint ."
+        if ".flake8" in names:
+            return ["flake8"]
+        elif "pylint.rc" in names:
+            return ["pylint"]
+        elif ".eslintrc.js" in names or ".eslintrc.json" in names:
+            return ["eslint", "."]
         else:
             # Default to flake8 for Python projects
-            return "flake8"
+            return ["flake8"]
 
     def run_formatter(
-        self, formatter_command: Optional[str] = None, check_only: bool = False
+        self, formatter_command: Optional[Command] = None, check_only: bool = False
     ) -> Dict[str, Any]:
         """
         Run code formatter.
@@ -177,11 +294,11 @@ class Runner:
             formatter_command = self._detect_formatter_command(check_only)
 
         result = self.run_command(formatter_command)
-        result["formatter_command"] = formatter_command
+        result["formatter_command"] = _display(formatter_command)
 
         return result
 
-    def _detect_formatter_command(self, check_only: bool = False) -> str:
+    def _detect_formatter_command(self, check_only: bool = False) -> List[str]:
         """
         Auto-detect formatter command.
 
@@ -189,39 +306,46 @@ class Runner:
             check_only: Only check formatting
 
         Returns:
-            Formatter command string
+            Formatter command argv
         """
+        names = self._root_entries()
+
         # Check for Python formatters
-        if (self.repo_path / "pyproject.toml").exists():
+        if "pyproject.toml" in names:
             if check_only:
-                return "black --check ."
+                return ["black", "--check", "."]
             else:
-                return "black ."
-        elif (self.repo_path / ".prettierrc").exists():
+                return ["black", "."]
+        elif ".prettierrc" in names:
             if check_only:
-                return "prettier --check ."
+                return ["prettier", "--check", "."]
             else:
-                return "prettier --write ."
+                return ["prettier", "--write", "."]
         else:
             # Default to black for Python projects
             if check_only:
-                return "black --check ."
+                return ["black", "--check", "."]
             else:
-                return "black ."
+                return ["black", "."]
 
     def run_script(
-        self, script_path: str, args: Optional[List[str]] = None
+        self, script_path: Union[str, IO[str]], args: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Run a script file.
 
         Args:
-            script_path: Path to script
+            script_path: Path to script, or a file-like object whose content
+                is piped to the Python interpreter without touching disk
             args: Script arguments
 
         Returns:
             Script execution results
         """
+        if not isinstance(script_path, str):
+            command = [sys.executable, "-", *(args or [])]
+            return self.run_command(command, input=script_path.read())
+
         script = Path(script_path)
 
         if not script.exists():
@@ -234,15 +358,49 @@ class Runner:
 
         # Build command based on file extension
         if script.suffix == ".py":
-            command = f"{sys.executable} {script_path}"
+            command = [sys.executable, script_path]
         elif script.suffix == ".sh":
-            command = f"bash {script_path}"
+            command = ["bash", script_path]
         elif script.suffix == ".js":
-            command = f"node {script_path}"
+            command = ["node", script_path]
         else:
-            command = script_path
+            command = [script_path]
 
         if args:
-            command += " " + " ".join(args)
+            command.extend(args)
 
         return self.run_command(command)
+
+
+def _start_reader(stream: IO[str], lines: deque) -> threading.Thread:
+    """Start a daemon thread appending the lines of stream to lines."""
+
+    def read() -> None:
+        with stream:
+            lines.extend(stream)
+
+    thread = threading.Thread(target=read, daemon=True)
+    thread.start()
+    return thread
+
+
+def _start_writer(stream: IO[str], text: str) -> threading.Thread:
+    """Start a daemon thread writing text to stream and then closing it."""
+
+    def write() -> None:
+        try:
+            with stream:
+                stream.write(text)
+        except BrokenPipeError:
+            pass  # The command exited without reading all of its input
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
+
+
+def _display(command: Command) -> str:
+    """Return a command as a shell-style string for reporting."""
+    if isinstance(command, str):
+        return command
+    return shlex.join(command)
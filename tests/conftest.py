@@ -0,0 +1,103 @@
+"""Shared pytest fixtures."""
+
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+from git import Repo
+
+from src.repoman import file_ops  # noqa: F401 - preloaded before collection
+from src.repoman.llm import LLMClient
+from src.repoman.runner import Runner
+
+# Keep test temp directories in RAM on Linux unless TMPDIR is already set
+if (
+    sys.platform.startswith("linux")
+    and "TMPDIR" not in os.environ
+    and os.access("/dev/shm", os.W_OK)
+):
+    os.environ["TMPDIR"] = "/dev/shm"
+    tempfile.tempdir = None  # Drop any cached result of gettempdir()
+
+
+@pytest.fixture(scope="session")
+def sample_repo(tmp_path_factory):
+    """
+    Create a small source tree once for the whole session.
+
+    Tests using it must not modify it.
+    """
+    root = tmp_path_factory.mktemp("sample_repo")
+    (root / "file1.py").write_bytes(b"print('1')")
+    (root / "file2.py").write_bytes(b"print('2')")
+    (root / "file3.txt").write_bytes(b"text")
+    (root / "subdir").mkdir()
+    (root / "subdir" / "nested.py").write_bytes(b"nested")
+    return root
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Create a git repository in tmp_path with one committed README.md."""
+    repo = Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    (tmp_path / "README.md").write_text("readme\n")
+    repo.index.add(["README.md"])
+    repo.index.commit("Initial commit")
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def llm_client(monkeypatch):
+    """
+    Create an OpenAI-configured LLMClient with a dummy key.
+
+    It never makes requests on its own; tests replace its provider when
+    they need responses.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    client = LLMClient("openai")
+    yield client
+    client.close()
+
+
+class FakeProcess:
+    """Stand-in for a finished subprocess.Popen with canned output."""
+
+    def __init__(self, stdout: str = "", stderr: str = "", returncode: int = 0):
+        self.stdin = None
+        self.stdout = io.StringIO(stdout)
+        self.stderr = io.StringIO(stderr)
+        self.returncode = returncode
+        self.pid = -1
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+@pytest.fixture
+def fake_popen(monkeypatch):
+    """
+    Make Runner start canned processes instead of real commands.
+
+    Returns a function taking the fake's stdout, stderr and returncode;
+    it returns the list that records each command Runner starts.
+    """
+
+    def install(stdout="", stderr="", returncode=0):
+        commands = []
+
+        def popen(runner, command, cwd, env, stdin=False):
+            commands.append(command)
+            return FakeProcess(stdout, stderr, returncode)
+
+        monkeypatch.setattr(Runner, "_popen", popen)
+        return commands
+
+    return install
@@ -0,0 +1,212 @@
+"""Tests for the repository agent."""
+
+import atexit
+
+import pytest
+
+from git import GitCommandError
+
+from src.repoman.agent import RepoAgent
+from src.repoman.git_ops import GitOperations
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """Create an agent for tmp_path with the default configuration."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = RepoAgent(str(tmp_path), config_path=str(tmp_path / "config.yaml"))
+    yield agent
+    agent.close()
+
+
+class TestLLMLifecycle:
+    """Test suite for the agent's lazily created LLM client."""
+
+    def test_close_registered_once(self, agent, monkeypatch):
+        """Test that re-creating the client does not re-register close."""
+        registered = []
+        monkeypatch.setattr(atexit, "register", registered.append)
+
+        agent.llm
+        agent.close()
+        agent.llm
+
+        assert registered == [agent.close]
+
+
+class TestClearCache:
+    """Test suite for RepoAgent.clear_cache."""
+
+    def test_clears_when_caching_disabled(self, agent, tmp_path):
+        """Test that responses cached earlier are removed with caching off."""
+        agent.cache.set("key", "value")
+        assert (tmp_path / ".repoman" / "cache").exists()
+        agent.cache = None
+
+        agent.clear_cache()
+
+        assert not (tmp_path / ".repoman" / "cache").exists()
+
+
+class TestFileIndex:
+    """Test suite for the agent's repository file listing."""
+
+    @pytest.fixture(autouse=True)
+    def files(self, tmp_path, git_repo):
+        """Add tracked, untracked and ignored files to the repository."""
+        (tmp_path / ".gitignore").write_bytes(b"ignored.py\n")
+        (tmp_path / "tracked.py").write_bytes(b"print('tracked')")
+        git_repo.index.add(["tracked.py"])
+        git_repo.index.commit("Add tracked.py")
+        (tmp_path / "untracked.py").write_bytes(b"print('untracked')")
+        (tmp_path / "ignored.py").write_bytes(b"print('ignored')")
+
+    def test_lists_non_ignored_files(self, agent):
+        """Test that tracked and untracked files are listed, ignored ones not."""
+        assert list(agent._get_file_index()) == [
+            ".gitignore",
+            "README.md",
+            "tracked.py",
+            "untracked.py",
+        ]
+
+        analysis = agent.analyze_codebase(["*.py"])
+
+        assert analysis["total_files"] == 2
+        assert analysis["files"] == ["tracked.py", "untracked.py"]
+
+    def test_rebuilt_after_write(self, agent):
+        """Test that writing a file drops the cached listing."""
+        assert "new.py" not in agent._get_file_index()
+
+        agent.write_file("new.py", "print('new')\n", commit=False)
+
+        assert "new.py" in agent._get_file_index()
+
+    def test_falls_back_to_walking_tree(self, agent, monkeypatch):
+        """Test that the tree is walked when git cannot list files."""
+
+        def ls_files(self, patterns=None):
+            raise GitCommandError(["git", "ls-files"], 128)
+
+        monkeypatch.setattr(GitOperations, "ls_files", ls_files)
+
+        files = list(agent._get_file_index())
+
+        assert "untracked.py" in files
+        assert "tracked.py" in files
+
+
+class StubLLM:
+    """LLM stand-in that estimates tokens and records commit diffs."""
+
+    def __init__(self):
+        self.diffs = []
+
+    def count_tokens(self, text: str) -> int:
+        return len(text) // 4 + 1
+
+    def generate_commit_message(self, diff: str) -> str:
+        self.diffs.append(diff)
+        return "Update readme"
+
+    def close(self) -> None:
+        pass
+
+
+class TestAutoCommit:
+    """Test suite for committing files written by the agent."""
+
+    def test_commit_message_from_staged_diff(self, agent, git_repo):
+        """Test that the written file is committed with a message from its diff."""
+        llm = agent._llm = StubLLM()
+
+        agent.write_file("README.md", "changed\n")
+
+        assert git_repo.head.commit.message.strip() == "[Repoman] Update readme"
+        assert len(llm.diffs) == 1
+        assert "README.md" in llm.diffs[0]
+        assert "+changed" in llm.diffs[0]
+
+    def test_unchanged_file_not_committed(self, agent, git_repo):
+        """Test that rewriting a file with the same content makes no commit."""
+        head = git_repo.head.commit
+        agent._llm = StubLLM()
+
+        agent.write_file("README.md", "readme\n")
+
+        assert git_repo.head.commit == head
+
+
+class TestAnalyzeCodebase:
+    """Test suite for RepoAgent.analyze_codebase."""
+
+    def test_outside_git_repository(self, agent, tmp_path):
+        """Test that a plain directory is walked and has no git status."""
+        (tmp_path / "app.py").write_bytes(b"print('app')")
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "util.py").write_bytes(b"print('util')")
+
+        analysis = agent.analyze_codebase(["*.py"])
+
+        assert analysis["files"] == ["app.py", "lib/util.py"]
+        assert analysis["git_status"] is None
+
+
+class TestPlanBatches:
+    """Test suite for RepoAgent._plan_batches."""
+
+    @pytest.fixture(autouse=True)
+    def estimate_tokens(self, agent):
+        """Count four characters per token."""
+        agent._llm = StubLLM()
+
+    def test_split_by_count(self, agent):
+        """Test that batches hold at most batch files."""
+        contents = {f"f{i}.py": "x" for i in range(5)}
+
+        assert agent._plan_batches(contents, 2) == [
+            ["f0.py", "f1.py"],
+            ["f2.py", "f3.py"],
+            ["f4.py"],
+        ]
+
+    def test_split_by_token_budget(self, agent):
+        """Test that batches stay within the context window minus max_tokens."""
+        agent.config.set("llm.context_window", 300)
+        agent.config.set("llm.max_tokens", 100)
+        # 399 characters estimate to 100 tokens, so two files fill the budget
+        contents = {f"f{i}.py": "x" * 399 for i in range(3)}
+
+        assert agent._plan_batches(contents, 8) == [["f0.py", "f1.py"], ["f2.py"]]
+
+    def test_oversized_file_gets_own_batch(self, agent):
+        """Test that a file over the budget is still sent, on its own."""
+        agent.config.set("llm.context_window", 300)
+        agent.config.set("llm.max_tokens", 100)
+        contents = {"small.py": "x", "big.py": "x" * 4000, "other.py": "x"}
+
+        assert agent._plan_batches(contents, 8) == [
+            ["small.py"],
+            ["big.py"],
+            ["other.py"],
+        ]
+
+
+class TestCleanCodeOutput:
+    """Test suite for RepoAgent._clean_code_output."""
+
+    @pytest.mark.parametrize(
+        "output,expected",
+        [
+            ("```python\ncode\n```", "code"),
+            ("```python\nline 1\nline 2\n```\n", "line 1\nline 2"),
+            ("```python\ncode", "code"),
+            ("code", "code"),
+            ("code```", "code"),
+            ("```\ncode```", "code"),
+        ],
+    )
+    def test_strips_fences(self, agent, output, expected):
+        """Test that opening and closing fences are removed."""
+        assert agent._clean_code_output(output) == expected
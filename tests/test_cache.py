@@ -0,0 +1,55 @@
+"""Tests for LLM response caching."""
+
+from src.repoman.cache import LLMCache
+
+
+class TestLLMCache:
+    """Test suite for LLMCache class."""
+
+    def test_get_missing_key(self, tmp_path):
+        """Test that a miss returns None."""
+        cache = LLMCache(str(tmp_path))
+
+        assert cache.get(LLMCache.make_key("missing")) is None
+
+    def test_set_and_get(self, tmp_path):
+        """Test storing and retrieving a response."""
+        cache = LLMCache(str(tmp_path))
+        key = LLMCache.make_key("openai", "gpt-4", 0.7, "code", "task")
+
+        cache.set(key, "analysis")
+
+        assert cache.get(key) == "analysis"
+
+    def test_make_key_depends_on_all_parts(self):
+        """Test that keys differ when any input differs."""
+        key = LLMCache.make_key("openai", "gpt-4", 0.7, "code", "task")
+
+        assert key == LLMCache.make_key("openai", "gpt-4", 0.7, "code", "task")
+        assert key != LLMCache.make_key("openai", "gpt-4", 0.5, "code", "task")
+        assert key != LLMCache.make_key("openai", "gpt-4", 0.7, "code2", "task")
+
+    def test_get_or_compute(self, tmp_path):
+        """Test that the response is only computed once."""
+        cache = LLMCache(str(tmp_path))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "result"
+
+        assert cache.get_or_compute("key", compute) == "result"
+        assert cache.get_or_compute("key", compute) == "result"
+        assert len(calls) == 1
+
+    def test_clear(self, tmp_path):
+        """Test clearing the cache."""
+        cache_dir = tmp_path / "cache"
+        cache = LLMCache(str(cache_dir))
+        cache.set("key", "value")
+
+        # Cache directory is ignored by git
+        assert (cache_dir / ".gitignore").read_text() == "*\n"
+
+        cache.clear()
+        assert cache.get("key") is None
@@ -1,22 +1,20 @@
 """Tests for configuration management."""
 
-import tempfile
-from pathlib import Path
+import os
 from src.repoman.config import Config
 
 
 class TestConfig:
     """Test suite for Config class."""
 
-    def test_default_config(self):
+    def test_default_config(self, tmp_path):
         """Test default configuration initialization."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_path = Path(tmpdir) / "config.yaml"
-            config = Config(str(config_path))
+        config_path = tmp_path / "config.yaml"
+        config = Config(str(config_path))
 
-            assert config.get("llm.provider") == "openai"
-            assert config.get("llm.model") == "gpt-4"
-            assert config.get("repository.auto_commit") is True
+        assert config.get("llm.provider") == "openai"
+        assert config.get("llm.model") == "gpt-4"
+        assert config.get("repository.auto_commit") is True
 
     def test_get_config_value(self):
         """Test getting configuration values."""
@@ -39,18 +37,34 @@ class TestConfig:
         config.set("new.nested.value", 123)
         assert config.get("new.nested.value") == 123
 
-    def test_save_and_load_config(self):
+    def test_save_and_load_config(self, tmp_path):
         """Test saving and loading configuration."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_path = Path(tmpdir) / "test_config.yaml"
-
-            # Create and save config
-            config1 = Config(str(config_path))
-            config1.set("llm.model", "gpt-3.5-turbo")
-            config1.set("custom.value", "test")
-            config1.save()
-
-            # Load config
-            config2 = Config(str(config_path))
-            assert config2.get("llm.model") == "gpt-3.5-turbo"
-            assert config2.get("custom.value") == "test"
+        config_path = tmp_path / "test_config.yaml"
+
+        # Create and save config
+        config1 = Config(str(config_path))
+        config1.set("llm.model", "gpt-3.5-turbo")
+        config1.set("custom.value", "test")
+        config1.save()
+
+        # Load config
+        config2 = Config(str(config_path))
+        assert config2.get("llm.model") == "gpt-3.5-turbo"
+        assert config2.get("custom.value") == "test"
+
+    def test_reload_unchanged_file(self, tmp_path):
+        """Test that reloading skips parsing when the file is unchanged."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("llm:\n  model: gpt-4\n")
+
+        config = Config(str(config_path))
+        config.config["marker"] = True
+        config.load_config()
+        assert config.get("marker") is True
+
+        config_path.write_text("llm:\n  model: gpt-3.5-turbo\n")
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        config.load_config()
+        assert config.get("marker") is None
+        assert config.get("llm.model") == "gpt-3.5-turbo"
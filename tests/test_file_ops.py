@@ -1,95 +1,271 @@
 """Tests for file operations."""
 
+import os
 import pytest
-import tempfile
 from pathlib import Path
-from src.repoman.file_ops import FileOperations
+from src.repoman.file_ops import (
+    MMAP_THRESHOLD,
+    FileList,
+    FileOperations,
+    _compile_patterns,
+)
+
+
+@pytest.fixture(scope="class")
+def file_ops_factory(tmp_path_factory):
+    """
+    Return a function building FileOperations, reusing instances.
+
+    One instance is kept per root and protected pattern set for the whole
+    test class. Without a root, a directory shared by the class is used,
+    so only tests that leave the tree unchanged should omit it.
+    """
+    shared_root = tmp_path_factory.mktemp("file_ops")
+    instances = {}
+
+    def factory(root=None, protected_patterns=None):
+        root = root or shared_root
+        key = (str(root), tuple(protected_patterns or ()))
+        if key not in instances:
+            instances[key] = FileOperations(root, protected_patterns=protected_patterns)
+        return instances[key]
+
+    return factory
+
+
+@pytest.fixture(scope="class")
+def protected_ops(file_ops_factory):
+    """Return a FileOperations with fixed protected patterns on a shared root."""
+    return file_ops_factory(protected_patterns=[".git/**", "config/**", "protected/**"])
 
 
 class TestFileOperations:
     """Test suite for FileOperations class."""
 
-    def test_read_file(self):
+    def test_read_file(self, tmp_path):
         """Test reading a file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            test_file = Path(tmpdir) / "test.txt"
-            test_content = "Hello, World!"
-            test_file.write_text(test_content)
+        test_file = tmp_path / "test.txt"
+        test_content = "Hello, World!"
+        test_file.write_text(test_content)
+
+        file_ops = FileOperations(tmp_path)
+        content = file_ops.read_file("test.txt")
+
+        assert content == test_content
+
+    def test_read_large_file(self, tmp_path):
+        """Test reading a file above the memory-map threshold."""
+        test_file = tmp_path / "large.txt"
+        test_file.write_bytes(b"line\r\n" * (MMAP_THRESHOLD // 6 + 1) + b"end\r")
 
-            file_ops = FileOperations(tmpdir)
-            content = file_ops.read_file("test.txt")
+        file_ops = FileOperations(tmp_path)
+        content = file_ops.read_file("large.txt")
 
-            assert content == test_content
+        assert content == "line\n" * (MMAP_THRESHOLD // 6 + 1) + "end\n"
 
-    def test_write_file(self):
+    def test_read_file_max_bytes(self, tmp_path):
+        """Test reading only the start of a file."""
+        (tmp_path / "test.txt").write_bytes("ab\r\nü".encode("utf-8"))
+
+        file_ops = FileOperations(tmp_path)
+
+        assert file_ops.read_file("test.txt", max_bytes=2) == "ab"
+        # The two-byte character is cut off at the limit and dropped
+        assert file_ops.read_file("test.txt", max_bytes=5) == "ab\n"
+        assert file_ops.read_file("test.txt", max_bytes=100) == "ab\nü"
+
+    def test_write_file(self, tmp_path):
         """Test writing to a file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            file_ops = FileOperations(tmpdir)
-            file_ops.write_file("test.txt", "Test content")
+        file_ops = FileOperations(tmp_path)
+        file_ops.write_file("test.txt", "Test content")
+
+        # A missing file would raise, so one read checks existence too
+        assert (tmp_path / "test.txt").read_bytes() == b"Test content"
+
+    def test_write_file_replaces_atomically(self, tmp_path):
+        """Test overwriting a file keeps its mode and leaves no temp files."""
+        test_file = tmp_path / "script.sh"
+        test_file.write_bytes(b"old")
+        test_file.chmod(0o750)
+
+        file_ops = FileOperations(tmp_path)
+        file_ops.write_file("script.sh", "new", durable=True)
+
+        assert test_file.read_text() == "new"
+        assert test_file.stat().st_mode & 0o777 == 0o750
+        assert os.listdir(tmp_path) == ["script.sh"]
+
+    def test_write_files(self, tmp_path):
+        """Test writing several files, refusing all if one is protected."""
+        file_ops = FileOperations(tmp_path, protected_patterns=["protected/**"])
+        file_ops.write_files([("a.txt", "a"), ("sub/b.txt", "b")], durable=True)
+
+        assert (tmp_path / "a.txt").read_text() == "a"
+        assert (tmp_path / "sub" / "b.txt").read_text() == "b"
 
-            test_file = Path(tmpdir) / "test.txt"
-            assert test_file.exists()
-            assert test_file.read_text() == "Test content"
+        with pytest.raises(PermissionError):
+            file_ops.write_files([("c.txt", "c"), ("protected/d.txt", "d")])
+        assert not (tmp_path / "c.txt").exists()
 
-    def test_protected_files(self):
+    @pytest.mark.parametrize(
+        "path,expected",
+        [
+            (".git/config", True),
+            ("config/settings.yaml", True),
+            ("protected/file.txt", True),
+            ("src/code.py", False),
+        ],
+    )
+    def test_protected_files(self, protected_ops, path, expected):
         """Test protected file patterns."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            file_ops = FileOperations(
-                tmpdir, protected_patterns=[".git/**", "config/**"]
-            )
+        assert protected_ops.is_protected(path) is expected
 
-            assert file_ops.is_protected(".git/config")
-            assert file_ops.is_protected("config/settings.yaml")
-            assert not file_ops.is_protected("src/code.py")
+    def test_protected_regex_shared(self, tmp_path):
+        """Test that instances with the same patterns share a compiled regex."""
+        first = FileOperations(tmp_path)
+        second = FileOperations(tmp_path)
+        assert first._protected_re is second._protected_re
 
-    def test_write_protected_file(self):
+        FileOperations.clear_cache()
+        assert _compile_patterns.cache_info().currsize == 0
+        assert FileOperations(tmp_path).is_protected(".git/config")
+
+    def test_write_protected_file(self, protected_ops):
         """Test that writing to protected files raises error."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            file_ops = FileOperations(tmpdir, protected_patterns=["protected/**"])
+        with pytest.raises(PermissionError):
+            protected_ops.write_file("protected/file.txt", "content")
+
+    def test_write_protected_file_through_symlink(self, tmp_path):
+        """Test that a symlink cannot be used to write protected files."""
+        (tmp_path / "protected").mkdir()
+        (tmp_path / "alias").symlink_to("protected")
+        file_ops = FileOperations(tmp_path, protected_patterns=["protected/**"])
 
-            with pytest.raises(PermissionError):
-                file_ops.write_file("protected/file.txt", "content")
+        with pytest.raises(PermissionError):
+            file_ops.write_file("alias/file.txt", "content")
+        with pytest.raises(PermissionError):
+            file_ops.write_file("other/../protected/file.txt", "content")
 
-    def test_list_files(self):
+    def test_list_files(self, file_ops_factory, sample_repo):
         """Test listing files."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create test files
-            (Path(tmpdir) / "file1.py").write_text("print('1')")
-            (Path(tmpdir) / "file2.py").write_text("print('2')")
-            (Path(tmpdir) / "file3.txt").write_text("text")
+        file_ops = file_ops_factory(sample_repo)
 
-            file_ops = FileOperations(tmpdir)
+        # List all Python files
+        py_files = file_ops.list_files(pattern="*.py")
+        assert py_files == ["file1.py", "file2.py"]
 
-            # List all Python files
-            py_files = file_ops.list_files(pattern="*.py")
-            assert len(py_files) == 2
-            assert "file1.py" in py_files
-            assert "file2.py" in py_files
+        unsorted = file_ops.list_files(pattern="*.py", sort=False)
+        assert sorted(unsorted) == py_files
 
-    def test_find_files_recursive(self):
+    def test_find_files_recursive(self, file_ops_factory, sample_repo):
         """Test finding files recursively."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create nested structure
-            subdir = Path(tmpdir) / "subdir"
-            subdir.mkdir()
-            (Path(tmpdir) / "root.py").write_text("root")
-            (subdir / "nested.py").write_text("nested")
+        file_ops = file_ops_factory(sample_repo)
+        py_files = file_ops.find_files("*.py")
+
+        assert py_files == ["file1.py", "file2.py", str(Path("subdir") / "nested.py")]
+
+    @pytest.mark.parametrize("dirs,depth", [(1, 1), (10, 1), (10, 3)])
+    def test_find_files_large_tree(self, tmp_path, dirs, depth):
+        """Test finding files in a 1000-file tree of varying shape."""
+        expected = []
+        for d in range(dirs):
+            directory = Path(*[f"d{d}"] * depth)
+            (tmp_path / directory).mkdir(parents=True, exist_ok=True)
+            for f in range(1000 // dirs):
+                name = f"f{f}.py" if f % 2 else f"f{f}.txt"
+                (tmp_path / directory / name).touch()
+                if name.endswith(".py"):
+                    expected.append(str(directory / name))
+
+        file_ops = FileOperations(tmp_path)
+
+        assert file_ops.find_files("*.py") == sorted(expected)
+        assert sorted(file_ops.find_files("*.py", sort=False)) == sorted(expected)
+
+    def test_find_files_path_pattern(self, tmp_path):
+        """Test that patterns with a slash are anchored at the directory."""
+        (tmp_path / "src" / "utils").mkdir(parents=True)
+        (tmp_path / "lib" / "src" / "utils").mkdir(parents=True)
+        (tmp_path / "src" / "utils" / "a.py").write_bytes(b"a")
+        (tmp_path / "src" / "utils" / "b.txt").write_bytes(b"b")
+        (tmp_path / "lib" / "src" / "utils" / "c.py").write_bytes(b"c")
+
+        file_ops = FileOperations(tmp_path)
+
+        assert file_ops.find_files("src/utils/*.py") == [
+            str(Path("src") / "utils" / "a.py")
+        ]
+        assert len(file_ops.find_files("src/**")) == 2
+        assert file_ops.find_files("missing/*.py") == []
+
+    def test_find_files_skips_ignored_dirs(self, tmp_path):
+        """Test that ignored directories are not searched."""
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "index.js").write_bytes(b"js")
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.js").write_bytes(b"js")
 
-            file_ops = FileOperations(tmpdir)
-            py_files = file_ops.find_files("*.py")
+        file_ops = FileOperations(tmp_path)
 
-            assert len(py_files) == 2
+        assert file_ops.find_files("*.js") == [str(Path("src") / "app.js")]
+        assert file_ops.list_files("src", include_dirs=True) == [
+            str(Path("src") / "app.js")
+        ]
 
-    def test_get_file_info(self):
+    def test_get_file_info(self, file_ops_factory, sample_repo):
         """Test getting file information."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            test_file = Path(tmpdir) / "test.txt"
-            test_file.write_text("content")
+        file_ops = file_ops_factory(sample_repo)
+        info = file_ops.get_file_info("file3.txt")
+
+        assert info["path"] == "file3.txt"
+        assert info["is_file"] is True
+        assert info["size"] > 0
+        assert "modified" in info
+
+    def test_find_files_multi(self, tmp_path):
+        """Test finding files for several patterns in one walk."""
+        root = tmp_path
+        (root / "sub").mkdir()
+        (root / ".git").mkdir()
+        (root / "node_modules").mkdir()
+        (root / "app.py").write_bytes(b"app")
+        (root / "app.js").write_bytes(b"app")
+        (root / "notes.txt").write_bytes(b"notes")
+        (root / "sub" / "nested.py").write_bytes(b"nested")
+        (root / ".git" / "hook.py").write_bytes(b"hook")
+        (root / "node_modules" / "dep.js").write_bytes(b"dep")
+
+        file_ops = FileOperations(tmp_path)
+        files = file_ops.find_files_multi(["*.py", "*.js"])
+
+        assert files == ["app.js", "app.py", str(Path("sub") / "nested.py")]
+
+    def test_filter_paths(self, file_ops_factory):
+        """Test filtering listed paths by pattern."""
+        file_ops = file_ops_factory()
+        paths = ["app.py", "src/lib.py", "src/lib.js", "docs/readme.md"]
+
+        assert file_ops.filter_paths(paths, ["*.py"]) == ["app.py", "src/lib.py"]
+        assert file_ops.filter_paths(paths, ["src/*"]) == [
+            "src/lib.py",
+            "src/lib.js",
+        ]
+
+
+class TestFileList:
+    """Test suite for FileList class."""
+
+    def test_sequence_access(self):
+        """Test indexing, slicing and iterating a compact path list."""
+        paths = ["a.py", "src/ünïcode.py", "", "docs/readme.md"]
+        file_list = FileList(paths)
 
-            file_ops = FileOperations(tmpdir)
-            info = file_ops.get_file_info("test.txt")
+        assert len(file_list) == 4
+        assert list(file_list) == paths
+        assert file_list[1] == "src/ünïcode.py"
+        assert file_list[-1] == "docs/readme.md"
+        assert file_list[1:3] == ["src/ünïcode.py", ""]
+        assert "a.py" in file_list
 
-            assert info["path"] == "test.txt"
-            assert info["is_file"] is True
-            assert info["size"] > 0
-            assert "modified" in info
+        with pytest.raises(IndexError):
+            file_list[4]
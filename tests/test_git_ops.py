@@ -0,0 +1,168 @@
+"""Tests for git operations."""
+
+import os
+
+import pytest
+
+from git import GitCommandError
+
+from src.repoman.git_ops import GitOperations
+
+
+class TestGitOperations:
+    """Test suite for GitOperations class."""
+
+    def test_get_status(self, tmp_path, git_repo):
+        """Test reading repository status."""
+        (tmp_path / "README.md").write_text("changed\n")
+        (tmp_path / "new.txt").write_text("new\n")
+
+        git_ops = GitOperations(tmp_path, status_ttl=0)
+        status = git_ops.get_status()
+
+        assert status["is_dirty"] is True
+        assert status["modified"] == ["README.md"]
+        assert status["untracked"] == ["new.txt"]
+        assert git_ops.get_status(include_untracked=False)["untracked"] == []
+
+    def test_get_status_staged_and_renamed(self, tmp_path, git_repo):
+        """Test that staged changes and renames are reported."""
+        git_repo.git.mv("README.md", "DOCS.md")
+        (tmp_path / "added.txt").write_text("added\n")
+        git_repo.git.add("added.txt")
+
+        status = GitOperations(tmp_path, status_ttl=0).get_status()
+
+        assert status["branch"] == git_repo.active_branch.name
+        assert status["staged"] == ["DOCS.md", "added.txt"]
+        assert status["modified"] == []
+        assert status["is_dirty"] is True
+
+    def test_status_is_cached_until_invalidated(self, tmp_path, git_repo):
+        """Test that cached status is reused and invalidated on changes."""
+        git_ops = GitOperations(tmp_path, status_ttl=60)
+
+        assert git_ops.get_status()["untracked"] == []
+
+        (tmp_path / "new.txt").write_text("new\n")
+        assert git_ops.get_status()["untracked"] == []
+
+        git_ops.invalidate_status()
+        assert git_ops.get_status()["untracked"] == ["new.txt"]
+
+    def test_commit(self, tmp_path, git_repo):
+        """Test committing changes."""
+        (tmp_path / "README.md").write_text("changed\n")
+
+        git_ops = GitOperations(tmp_path)
+        sha = git_ops.commit("Update readme", ["README.md"])
+
+        assert sha == git_repo.head.commit.hexsha
+        assert git_ops.get_status()["is_dirty"] is False
+
+    def test_get_diff_summary(self, tmp_path, git_repo):
+        """Test that the diff summary is bounded in size."""
+        (tmp_path / "README.md").write_text("changed\n" * 1000)
+
+        git_ops = GitOperations(tmp_path)
+        summary = git_ops.get_diff_summary(max_bytes=1024)
+
+        assert summary.startswith(" README.md | 1001 ")
+        assert "+changed" in summary
+        assert summary.endswith("... diff truncated after 1024 bytes")
+        assert len(summary) < 2048
+        assert GitOperations(tmp_path).get_diff_summary(staged=True) == ""
+
+    def test_status_cache_invalidated_by_index_change(self, tmp_path, git_repo):
+        """Test that staging outside GitOperations invalidates cached status."""
+        git_ops = GitOperations(tmp_path, status_ttl=60, include_untracked=False)
+        (tmp_path / "README.md").write_text("changed\n")
+
+        assert git_ops.get_status()["modified"] == ["README.md"]
+
+        git_repo.git.add("README.md")
+        assert git_ops.get_status()["staged"] == ["README.md"]
+
+    def test_background_refresh_leaves_index_alone(self, tmp_path, git_repo):
+        """Test that background status queries never rewrite the index."""
+        readme = tmp_path / "README.md"
+        git_ops = GitOperations(tmp_path, status_ttl=60)
+        # Same content with a new mtime, so git status would refresh the index
+        os.utime(readme, ns=(0, readme.stat().st_mtime_ns + 10**9))
+        before = git_ops._index_stat()
+
+        git_ops._background_status_refresh(True)
+
+        assert git_ops._index_stat() == before
+        assert git_ops.get_status()["is_dirty"] is False
+
+    def test_ls_files(self, tmp_path, git_repo):
+        """Test listing tracked and untracked files without ignored ones."""
+        (tmp_path / ".gitignore").write_bytes(b"*.log\nbuild/\n")
+        (tmp_path / "app.py").write_bytes(b"print('app')")
+        (tmp_path / "debug.log").write_bytes(b"log")
+        (tmp_path / "build").mkdir()
+        (tmp_path / "build" / "out.py").write_bytes(b"out")
+
+        git_ops = GitOperations(tmp_path)
+
+        assert git_ops.ls_files() == [".gitignore", "README.md", "app.py"]
+        assert git_ops.ls_files(["*.py"]) == ["app.py"]
+
+    def test_is_staged(self, tmp_path, git_repo):
+        """Test detecting staged changes."""
+        git_ops = GitOperations(tmp_path)
+        (tmp_path / "README.md").write_text("changed\n")
+
+        assert git_ops.is_staged() is False
+
+        git_repo.git.add("README.md")
+        assert git_ops.is_staged() is True
+
+    def test_commit_nothing(self, tmp_path, git_repo):
+        """Test that committing a clean tree raises an error."""
+
+        with pytest.raises(ValueError):
+            GitOperations(tmp_path).commit("Nothing")
+
+    def test_get_recent_commits_and_history(self, tmp_path, git_repo):
+        """Test reading commit history."""
+        (tmp_path / "other.txt").write_text("other\n")
+        git_repo.index.add(["other.txt"])
+        git_repo.index.commit("Add other\n\nWith a body.")
+
+        git_ops = GitOperations(tmp_path)
+        commits = git_ops.get_recent_commits(count=5)
+
+        assert [c["message"] for c in commits] == [
+            "Add other\n\nWith a body.",
+            "Initial commit",
+        ]
+        assert commits[0]["sha"] == git_repo.head.commit.hexsha
+        assert commits[0]["author"] == "Test"
+        assert git_ops.get_recent_commits(count=1) == commits[:1]
+
+        history = git_ops.get_file_history("README.md")
+        assert [c["message"] for c in history] == ["Initial commit"]
+        assert len(history[0]["sha"]) == 8
+
+    def test_apply_diff(self, tmp_path, git_repo):
+        """Test applying a diff with and without the fast path."""
+        readme = tmp_path / "README.md"
+        readme.write_text("readme\nmore\n")
+        diff = git_repo.git.diff() + "\n"
+        git_repo.git.checkout("README.md")
+
+        git_ops = GitOperations(tmp_path, status_ttl=0)
+        git_ops.apply_diff(diff)
+        assert readme.read_text() == "readme\nmore\n"
+        assert git_ops.is_staged()
+
+        git_repo.git.reset("--hard")
+        git_ops.apply_diff(diff.encode(), fast=False)
+        assert readme.read_text() == "readme\nmore\n"
+
+        with pytest.raises(GitCommandError):
+            git_ops.apply_diff(diff.replace("README.md", "missing.md"))
+        with pytest.raises(ValueError):
+            git_ops.apply_diff("not a diff")
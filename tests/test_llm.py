@@ -0,0 +1,138 @@
+"""Tests for LLM helpers."""
+
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+from src.repoman.llm import (
+    LLMProvider,
+    RateLimiter,
+    _parse_batch_analysis,
+    _summarize_diff,
+)
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter class."""
+
+    def test_unlimited(self):
+        """Test that a limiter without limits never waits."""
+        limiter = RateLimiter()
+
+        start = time.monotonic()
+        for _ in range(1000):
+            limiter.acquire(tokens=10**6)
+
+        assert time.monotonic() - start < 0.5
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst and then throttles."""
+        limiter = RateLimiter(tpm=60000)
+
+        start = time.monotonic()
+        limiter.acquire(tokens=60000)
+        assert time.monotonic() - start < 0.05
+
+        # Refills at 1000 tokens per second
+        limiter.acquire(tokens=100)
+        assert time.monotonic() - start >= 0.09
+
+
+class SleepProvider(LLMProvider):
+    """Provider that answers after a fixed delay."""
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        time.sleep(0.05)
+        return prompt.upper()
+
+
+class TestLLMClient:
+    """Test suite for LLMClient class."""
+
+    def test_generate_many(self, llm_client):
+        """Test that prompts are dispatched concurrently and keep their order."""
+        llm_client.provider.close()
+        llm_client.provider = SleepProvider()
+        prompts = [f"prompt {i}" for i in range(8)]
+
+        start = time.monotonic()
+        results = asyncio.run(llm_client.generate_many(prompts, concurrency=8))
+
+        assert results == [prompt.upper() for prompt in prompts]
+        assert time.monotonic() - start < 0.3
+
+
+class TestParseBatchAnalysis:
+    """Test suite for _parse_batch_analysis."""
+
+    def test_fenced_json(self):
+        """Test that a JSON object inside a code fence is parsed."""
+        response = '```json\n{"a.py": "fine", "b.py": "rename x"}\n```'
+
+        result = _parse_batch_analysis(response, {"a.py": "", "b.py": ""})
+
+        assert result == {"a.py": "fine", "b.py": "rename x"}
+
+    def test_prose_around_object(self):
+        """Test that text before and after the object is ignored."""
+        response = 'Here you go:\n{"a.py": "fine"}\nLet me know if you need more.'
+
+        assert _parse_batch_analysis(response, {"a.py": ""}) == {"a.py": "fine"}
+
+    def test_non_dict_reply(self):
+        """Test that a reply without a JSON object is rejected."""
+        with pytest.raises(ValueError):
+            _parse_batch_analysis('["fine"]', {"a.py": ""})
+
+    def test_missing_path(self):
+        """Test that a reply must cover every file sent."""
+        with pytest.raises(ValueError, match="b.py"):
+            _parse_batch_analysis('{"a.py": "fine"}', {"a.py": "", "b.py": ""})
+
+
+class TestCountTokens:
+    """Test suite for LLMClient.count_tokens."""
+
+    def test_falls_back_when_encoding_fails(self, llm_client, monkeypatch):
+        """Test that any tiktoken failure falls back to the length estimate."""
+
+        def encoding_for_model(model):
+            raise OSError("network unreachable")
+
+        monkeypatch.setitem(
+            sys.modules,
+            "tiktoken",
+            types.SimpleNamespace(encoding_for_model=encoding_for_model),
+        )
+
+        assert llm_client.count_tokens("x" * 40) == 11
+
+
+class TestSummarizeDiff:
+    """Test suite for diff summarization."""
+
+    def test_small_diff_unchanged(self):
+        """Test that a diff within budget is returned as-is."""
+        diff = "diff --git a/x.py b/x.py\n@@ -1 +1 @@\n-a\n+b\n"
+
+        assert _summarize_diff(diff) == diff
+
+    def test_large_diff_keeps_heads_and_tails(self):
+        """Test that large diffs keep file headers, counts and hunk ends."""
+        body = "".join(f"+line {i}\n" for i in range(1000))
+        diff = (
+            "diff --git a/big.py b/big.py\n--- a/big.py\n+++ b/big.py\n"
+            f"@@ -0,0 +1,1000 @@\n{body}"
+            "diff --git a/small.py b/small.py\n@@ -1 +1 @@\n-old\n+new\n"
+        )
+
+        summary = _summarize_diff(diff, max_chars=2000)
+
+        assert len(summary) < 2000
+        assert summary.startswith(" big.py | +1000 -0\n small.py | +1 -1\n")
+        assert "+line 0\n" in summary and "+line 999" in summary
+        assert "+line 500\n" not in summary
+        assert "diff --git a/small.py b/small.py\n@@ -1 +1 @@\n-old\n+new" in summary
@@ -1,67 +1,153 @@
 """Tests for test and script runner."""
 
-import tempfile
-from pathlib import Path
-from src.repoman.runner import Runner
-
+import io
+import os
+import sys
+import time
 
-class TestRunner:
-    """Test suite for Runner class."""
+import pytest
 
-    def test_run_command_success(self):
-        """Test running a successful command."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = Runner(tmpdir)
-            result = runner.run_command("echo 'Hello'")
+from src.repoman.runner import Runner
 
-            assert result["success"] is True
-            assert result["returncode"] == 0
-            assert "Hello" in result["stdout"]
+# Tests that start processes share one xdist worker, leaving the others free
+# for the fast in-process tests
+SUBPROCESS = pytest.mark.xdist_group("subprocess")
 
-    def test_run_command_failure(self):
-        """Test running a failing command."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = Runner(tmpdir)
-            result = runner.run_command("exit 1")
 
-            assert result["success"] is False
-            assert result["returncode"] == 1
+@pytest.fixture(scope="module")
+def runner_in_empty_dir(tmp_path_factory):
+    """Return a Runner on an empty directory shared by the module."""
+    return Runner(tmp_path_factory.mktemp("empty"))
 
-    def test_run_command_timeout(self):
-        """Test command timeout."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = Runner(tmpdir, timeout=1)
-            result = runner.run_command("sleep 10", timeout=1)
 
-            assert result["success"] is False
-            assert "timed out" in result["stderr"].lower()
+class TestRunner:
+    """Test suite for Runner class."""
 
-    def test_run_script_python(self):
-        """Test running a Python script."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            script_path = Path(tmpdir) / "test_script.py"
-            script_path.write_text("print('Script executed')")
+    def test_run_command_success(self, runner_in_empty_dir, fake_popen):
+        """Test collecting the result of a successful command."""
+        commands = fake_popen(stdout="Hello\n")
+        runner = runner_in_empty_dir
+        result = runner.run_command(["echo", "Hello"])
+
+        assert commands == [["echo", "Hello"]]
+        assert result["success"] is True
+        assert result["returncode"] == 0
+        assert "Hello" in result["stdout"]
+
+    @SUBPROCESS
+    @pytest.mark.parametrize(
+        "command,success,returncode,stdout",
+        [("echo 'Hello'", True, 0, "Hello\n"), ("exit 1", False, 1, "")],
+    )
+    def test_run_command_shell(
+        self, runner_in_empty_dir, command, success, returncode, stdout
+    ):
+        """Test running succeeding and failing shell commands."""
+        result = runner_in_empty_dir.run_command(command)
+
+        assert result["success"] is success
+        assert result["returncode"] == returncode
+        assert result["stdout"] == stdout
+
+    @SUBPROCESS
+    def test_run_command_timeout(self, runner_in_empty_dir):
+        """Test command timeout."""
+        runner = runner_in_empty_dir
+        result = runner.run_command("sleep 5", timeout=0.05)
+
+        assert result["success"] is False
+        assert "timed out" in result["stderr"].lower()
+
+    @SUBPROCESS
+    def test_run_command_without_timeout(self, tmp_path):
+        """Test that a runner without a timeout waits for the command."""
+        runner = Runner(tmp_path, timeout=None)
+        result = runner.run_command("echo hi")
+
+        assert result["success"] is True
+        assert result["stdout"] == "hi\n"
+
+    @SUBPROCESS
+    def test_run_command_non_utf8_output(self, runner_in_empty_dir):
+        """Test that undecodable output bytes are replaced, not fatal."""
+        script = (
+            "import sys; "
+            "sys.stdout.buffer.write(b'ok\\n\\xff\\xfe\\n'); "
+            "sys.stdout.buffer.flush(); "
+            "print('after')"
+        )
+        result = runner_in_empty_dir.run_command([sys.executable, "-c", script])
+
+        assert result["success"] is True
+        assert result["stdout"] == "ok\n\ufffd\ufffd\nafter\n"
+
+    @SUBPROCESS
+    def test_run_command_argv(self, runner_in_empty_dir):
+        """Test running an argv list without a shell."""
+        runner = runner_in_empty_dir
+        result = runner.run_command([sys.executable, "-c", "print('$HOME')"])
+
+        assert result["success"] is True
+        assert result["stdout"].strip() == "$HOME"
+
+    @SUBPROCESS
+    def test_run_command_timeout_kills_group(self, tmp_path):
+        """Test that a timeout also stops processes started by the command."""
+        runner = Runner(tmp_path)
+        command = "(sleep 0.2; touch survived) & wait"
+        result = runner.run_command(command, timeout=0.05)
+        assert result["returncode"] == -1
+
+        # A background job outside the killed group would create the file
+        time.sleep(0.3)
+        assert not (tmp_path / "survived").exists()
+
+    def test_run_command_keeps_output_tail(self, tmp_path, fake_popen):
+        """Test that only the last max_lines lines are kept unless asked."""
+        output = "".join(f"{i}\n" for i in range(10))
+        runner = Runner(tmp_path, max_lines=3)
+
+        fake_popen(stdout=output)
+        assert runner.run_command("count")["stdout"] == "7\n8\n9\n"
+
+        fake_popen(stdout=output)
+        assert runner.run_command("count", full_capture=True)["stdout"] == output
+
+    @SUBPROCESS
+    def test_run_script_python(self, runner_in_empty_dir):
+        """Test running a Python script piped from a file-like object."""
+        runner = runner_in_empty_dir
+        result = runner.run_script(
+            io.StringIO("import sys; print('Script executed', sys.argv[1:])"),
+            args=["a b"],
+        )
+
+        assert result["success"] is True
+        assert "Script executed ['a b']" in result["stdout"]
+
+    @SUBPROCESS
+    def test_run_script_not_found(self, runner_in_empty_dir):
+        """Test running a non-existent script."""
+        runner = runner_in_empty_dir
+        result = runner.run_script("nonexistent.py")
 
-            runner = Runner(tmpdir)
-            result = runner.run_script(str(script_path))
+        assert result["success"] is False
+        assert "not found" in result["stderr"].lower()
 
-            assert result["success"] is True
-            assert "Script executed" in result["stdout"]
+    def test_detect_test_command(self, runner_in_empty_dir):
+        """Test auto-detection of test command."""
+        runner = runner_in_empty_dir
+        command = runner._detect_test_command()
 
-    def test_run_script_not_found(self):
-        """Test running a non-existent script."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = Runner(tmpdir)
-            result = runner.run_script("nonexistent.py")
+        # Should default to pytest
+        assert command == ["pytest"]
 
-            assert result["success"] is False
-            assert "not found" in result["stderr"].lower()
+    def test_detect_command_tracks_root_changes(self, tmp_path):
+        """Test that detection picks up files added to the repo root."""
+        runner = Runner(tmp_path)
+        assert runner._detect_linter_command() == ["flake8"]
 
-    def test_detect_test_command(self):
-        """Test auto-detection of test command."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = Runner(tmpdir)
-            command = runner._detect_test_command()
+        (tmp_path / ".eslintrc.json").write_bytes(b"{}")
+        os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 10**9))
 
-            # Should default to pytest
-            assert "pytest" in command.lower()
+        assert runner._detect_linter_command() == ["eslint", "."]